@@ -0,0 +1,79 @@
+"""Resized variants of uploaded room images.
+
+render_variants runs in a worker process (see ImageProcessor in server.py),
+so this module imports nothing from the app. Files are named after the
+original's content hash, which makes every URL immutable: the same upload
+always maps to the same names, and files that already exist are never
+rewritten.
+"""
+import io
+import os
+from pathlib import Path
+from typing import Dict
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # optional; uploads answer 501 without it
+    Image = None
+
+# Anything larger is rejected before it is decoded
+MAX_IMAGE_PIXELS = 50_000_000
+
+FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+
+class InvalidImageError(ValueError):
+    pass
+
+def variant_name(digest: str, variant: str, extension: str) -> str:
+    return f"{digest}-{variant}.{extension}"
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + f".{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+def _encode(image, extension: str, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    if extension == "jpeg":
+        image.convert("RGB").save(buffer, "JPEG", quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, "WEBP", quality=quality, method=4)
+    return buffer.getvalue()
+
+def render_variants(data: bytes, directory: str, digest: str, sizes: Dict[str, int], extension: str,
+                    quality: int) -> Dict[str, str]:
+    """Store the original and each variant fitted within sizes[name] pixels.
+
+    Returns {variant: file name}. Raises InvalidImageError for anything Pillow
+    cannot decode or that is too large to decode safely.
+    """
+    root = Path(directory)
+    names = {variant: variant_name(digest, variant, extension) for variant in sizes}
+    if all((root / name).exists() for name in names.values()):
+        return names
+
+    try:
+        image = Image.open(io.BytesIO(data))
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise InvalidImageError(f"Image is larger than {MAX_IMAGE_PIXELS:,} pixels")
+        # JPEGs can decode straight at a reduced scale, far cheaper than a full decode
+        image.draft("RGB", (max(sizes.values()),) * 2)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+    except (OSError, Image.DecompressionBombError) as exc:
+        raise InvalidImageError("Not a supported image") from exc
+
+    (root / "originals").mkdir(parents=True, exist_ok=True)
+    original = root / "originals" / digest
+    if not original.exists():
+        _write_atomic(original, data)
+
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    # Largest first, each variant resized from the previous one
+    for variant, size in sorted(sizes.items(), key=lambda item: -item[1]):
+        image.thumbnail((size, size), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        path = root / names[variant]
+        if not path.exists():
+            _write_atomic(path, _encode(image, extension, quality))
+    return names
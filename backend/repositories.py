@@ -0,0 +1,822 @@
+"""Storage for rooms, bookings, contact messages and admins.
+
+Handlers in server.py reach these four collections only through a storage
+object: MotorStorage keeps them in MongoDB, MemoryStorage keeps them in
+process behind secondary indexes so handler logic can be tested and
+benchmarked without a database. Both must pass tests/test_repositories.py.
+
+Every repository offers:
+
+- ``get(id)``, ``exists(id)``, ``get_many(ids)`` and ``get_by(field, value)``
+- ``insert(doc)`` / ``insert_many(docs)``, raising DuplicateRecordError on a
+  repeated id (or admin email), and ``upsert_many(docs)`` replacing by id
+- ``update(id, fields)`` returning the updated record, ``delete(id)``
+  returning the removed one
+- ``count(**equals)`` and ``counts(field, values)`` for dashboard totals
+- ``find(...)`` / ``iterate(...)``: newest first by (created_at, id) with
+  keyset paging, or relevance-ranked with offset paging for text searches
+
+Rooms add ``catalog(...)`` for the public room list: id batches, a price
+range, a pymongo-style sort and a field subset, and ``add_images(id, urls)``
+to append image URLs without a read-modify-write.
+
+Records go in and come out as plain dicts; callers never see ``_id`` or the
+normalized search keys kept beside email and phone fields, and never share a
+dict with the store. ``date`` values are stored as UTC
+midnight datetimes, since BSON has no date-only type, and a repository's
+``date_fields`` are turned back into dates on the way out.
+
+Storage also keeps ``occupancy``: active bookings per room and calendar
+month, which ``rooms.available(...)`` reads to answer date-range queries.
+"""
+import asyncio
+import bisect
+import re
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel, ReplaceOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+NEWEST_FIRST = [("created_at", DESCENDING), ("id", DESCENDING)]
+RANKED = [("score", {"$meta": "textScore"})] + NEWEST_FIRST
+BATCH_SIZE = 500
+OCCUPANCY_COLLECTION = "room_occupancy"
+
+PHONE_TERM = re.compile(r"^\+?[\d\s().-]{3,}$")
+NON_DIGITS = re.compile(r"\D")
+BOOKING_PREFIX_FIELDS = ("email", "phone_number")
+BOOKING_DATE_FIELDS = ("preferred_move_in_date", "move_out_date")
+CONTACT_PREFIX_FIELDS = ("email",)
+# Prefix searches match a normalized copy of each field, stored under these names
+SEARCH_KEYS = {"email": "email_search", "phone_number": "phone_number_search"}
+# One text search language everywhere: "none" matches words as written, which
+# is also all the in-memory backend does
+TEXT_LANGUAGE = "none"
+
+# A room is "almost_full" once this fraction of its slots or less remains
+ALMOST_FULL_FRACTION = 0.25
+
+# Text index weights, also used to rank in-memory searches
+BOOKING_TEXT_WEIGHTS = {"full_name": 10, "email": 5, "phone_number": 5, "school": 2}
+CONTACT_TEXT_WEIGHTS = {"name": 10, "email": 5, "message": 1}
+
+INDEXES = {
+    "rooms": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("availability_status", ASCENDING)], name="availability_status"),
+        IndexModel([("room_type", ASCENDING), ("availability_status", ASCENDING)], name="room_type_availability_status"),
+        # Catalog price ranges and sorts; id keeps equal prices in a stable order
+        IndexModel([("price", ASCENDING), ("id", ASCENDING)], name="price_id"),
+        IndexModel([("room_type", ASCENDING), ("price", ASCENDING), ("id", ASCENDING)], name="room_type_price_id"),
+        IndexModel([("name", ASCENDING), ("id", ASCENDING)], name="name_id"),
+        IndexModel([("created_at", ASCENDING), ("id", ASCENDING)], name="created_at_id"),
+    ],
+    "bookings": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id_desc"),
+        IndexModel([("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)], name="status_created_at_id_desc"),
+        IndexModel([("updated_at", DESCENDING)], name="updated_at_desc"),
+        IndexModel([(SEARCH_KEYS["email"], ASCENDING)], name="email_search"),
+        IndexModel([(SEARCH_KEYS["phone_number"], ASCENDING)], name="phone_number_search"),
+        IndexModel(
+            [("full_name", TEXT), ("email", TEXT), ("phone_number", TEXT), ("school", TEXT)],
+            weights=BOOKING_TEXT_WEIGHTS,
+            default_language=TEXT_LANGUAGE,
+            name="search_text",
+        ),
+    ],
+    "contact_messages": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id_desc"),
+        IndexModel([(SEARCH_KEYS["email"], ASCENDING)], name="email_search"),
+        IndexModel(
+            [("name", TEXT), ("email", TEXT), ("message", TEXT)],
+            weights=CONTACT_TEXT_WEIGHTS,
+            default_language=TEXT_LANGUAGE,
+            name="search_text",
+        ),
+    ],
+    "admins": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+    ],
+    # Serves both the $inc upserts and the per-room month range in rooms.available
+    OCCUPANCY_COLLECTION: [
+        IndexModel([("room_id", ASCENDING), ("month", ASCENDING)], unique=True, name="room_id_month_unique"),
+    ],
+}
+
+class DuplicateRecordError(Exception):
+    """A record with the same id, or another unique field, already exists."""
+
+def keyset_query(query: dict, after) -> dict:
+    """Restrict query to documents strictly after the (created_at, id) cursor."""
+    created_at, doc_id = after
+    seek = {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "id": {"$lt": doc_id}},
+    ]}
+    return {"$and": [query, seek]} if query else seek
+
+def prefix_field(term: str, prefix_fields) -> Optional[str]:
+    """The field a search term is prefix-matched on, or None for a text search.
+
+    Terms that look like an email address or phone number become anchored
+    prefix matches on the field's normalized search key, so they can walk
+    its ascending index; everything else is a ranked search over the text
+    index.
+    """
+    if "email" in prefix_fields and "@" in term:
+        return "email"
+    if "phone_number" in prefix_fields and PHONE_TERM.match(term) and NON_DIGITS.sub("", term):
+        return "phone_number"
+    return None
+
+def search_key(field: str, value):
+    """The form a prefix-searched field is stored and matched in.
+
+    Emails ignore case, phone numbers keep only their digits, so "Ama@X.com"
+    and "055 123-4567" find what was entered as "ama@x.com" and "0551234567".
+    """
+    if not isinstance(value, str):
+        return None
+    if field == "phone_number":
+        return NON_DIGITS.sub("", value)
+    return value.strip().lower()
+
+def search_query(search: str, prefix_fields) -> tuple:
+    """Translate an admin search box term into a Mongo (query, ranked) pair."""
+    term = search.strip()
+    field = prefix_field(term, prefix_fields)
+    if field is not None:
+        return {SEARCH_KEYS[field]: {"$regex": "^" + re.escape(search_key(field, term))}}, False
+    return {"$text": {"$search": term}}, True
+
+def catalog_query(equals: Optional[dict], ids, min_price, max_price) -> dict:
+    query = dict(equals or {})
+    if ids is not None:
+        query["id"] = {"$in": list(ids)}
+    price = {}
+    if min_price is not None:
+        price["$gte"] = min_price
+    if max_price is not None:
+        price["$lte"] = max_price
+    if price:
+        query["price"] = price
+    return query
+
+def as_datetime(value):
+    """A date as UTC midnight; datetimes and everything else pass through."""
+    if isinstance(value, date) and not isinstance(value, datetime):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    return value
+
+def to_storage(doc: dict, prefix_fields=()) -> dict:
+    """doc as stored: dates as datetimes, plus search keys for its prefix fields."""
+    stored = {key: as_datetime(value) for key, value in doc.items()}
+    for field in prefix_fields:
+        if field in doc:
+            stored[SEARCH_KEYS[field]] = search_key(field, doc[field])
+    return stored
+
+def as_date(value):
+    """The calendar day of a stored UTC midnight; anything else passes through."""
+    if isinstance(value, datetime):
+        return (value.astimezone(timezone.utc) if value.tzinfo else value).date()
+    return value
+
+def from_storage(doc: Optional[dict], date_fields=()) -> Optional[dict]:
+    """doc without search keys and with its date_fields turned back into dates, in place."""
+    if doc is not None:
+        for key in SEARCH_KEYS.values():
+            doc.pop(key, None)
+        for field in date_fields:
+            if field in doc:
+                doc[field] = as_date(doc[field])
+    return doc
+
+def month_start(value) -> datetime:
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+def stay_months(start, end) -> List[datetime]:
+    """First days of the calendar months a stay from start up to (not including) end touches."""
+    month = month_start(start)
+    last = month_start(max(end - timedelta(days=1), start))
+    months = []
+    while month <= last:
+        months.append(month)
+        month = month_start(month + timedelta(days=31))
+    return months
+
+def derive_availability(available_slots: int, total_slots: int) -> str:
+    if available_slots <= 0:
+        return "fully_booked"
+    if available_slots <= total_slots * ALMOST_FULL_FRACTION:
+        return "almost_full"
+    return "available"
+
+# Server-side equivalent of derive_availability for pipeline updates
+AVAILABILITY_EXPR = {"$switch": {
+    "branches": [
+        {"case": {"$lte": ["$available_slots", 0]}, "then": "fully_booked"},
+        {"case": {"$lte": ["$available_slots", {"$multiply": ["$total_slots", ALMOST_FULL_FRACTION]}]}, "then": "almost_full"},
+    ],
+    "default": "available",
+}}
+
+# ===================== MOTOR =====================
+
+class MotorRepository:
+    def __init__(self, collection, projection: Optional[dict] = None, prefix_fields=(), since_field: str = "created_at",
+                 date_fields=()):
+        self.collection = collection
+        self.projection = projection or {"_id": 0}
+        self.prefix_fields = prefix_fields
+        self.since_field = since_field
+        self.date_fields = tuple(date_fields)
+
+    def _load(self, doc: Optional[dict]) -> Optional[dict]:
+        return from_storage(doc, self.date_fields)
+
+    async def get(self, record_id: str) -> Optional[dict]:
+        return self._load(await self.collection.find_one({"id": record_id}, self.projection))
+
+    async def exists(self, record_id: str) -> bool:
+        return await self.collection.count_documents({"id": record_id}, limit=1) > 0
+
+    async def get_many(self, record_ids: List[str]) -> List[dict]:
+        docs = await self.collection.find({"id": {"$in": record_ids}}, self.projection).to_list(len(record_ids))
+        return [self._load(doc) for doc in docs]
+
+    async def get_by(self, field: str, value) -> Optional[dict]:
+        return self._load(await self.collection.find_one({field: value}, self.projection))
+
+    async def insert(self, doc: dict):
+        try:
+            await self.collection.insert_one(to_storage(doc, self.prefix_fields))
+        except DuplicateKeyError as e:
+            raise DuplicateRecordError(str(e)) from e
+
+    async def insert_many(self, docs: Iterable[dict]):
+        try:
+            await self.collection.insert_many([to_storage(doc, self.prefix_fields) for doc in docs])
+        except BulkWriteError as e:
+            if all(error.get("code") == 11000 for error in e.details.get("writeErrors", [])):
+                raise DuplicateRecordError(str(e)) from e
+            raise
+
+    async def upsert_many(self, docs: List[dict]) -> tuple:
+        """Replace or insert each document by id; returns (inserted, updated)."""
+        if not docs:
+            return 0, 0
+        result = await self.collection.bulk_write(
+            [ReplaceOne({"id": doc["id"]}, to_storage(doc, self.prefix_fields), upsert=True) for doc in docs],
+            ordered=False,
+        )
+        return result.upserted_count, result.matched_count
+
+    async def update(self, record_id: str, fields: dict) -> Optional[dict]:
+        return self._load(await self.collection.find_one_and_update(
+            {"id": record_id}, {"$set": to_storage(fields, self.prefix_fields)},
+            projection=self.projection, return_document=ReturnDocument.AFTER,
+        ))
+
+    async def delete(self, record_id: str) -> Optional[dict]:
+        return self._load(await self.collection.find_one_and_delete({"id": record_id}, self.projection))
+
+    async def count(self, **equals) -> int:
+        return await self.collection.count_documents(equals)
+
+    async def counts(self, field: Optional[str] = None, values=()) -> Dict[str, int]:
+        """Total count plus one count per value of field, queried concurrently.
+
+        Each per-value count is its own count_documents so it can be answered
+        from the index on field; a $facet would scan the whole collection.
+        """
+        queries = {"total": {}, **{value: {field: value} for value in values}}
+        results = await asyncio.gather(*(self.collection.count_documents(query) for query in queries.values()))
+        return dict(zip(queries, results))
+
+    def ranks(self, search: Optional[str]) -> bool:
+        return bool(search) and prefix_field(search.strip(), self.prefix_fields) is None
+
+    def _cursor(self, equals, search, since, after, offset, limit, newest_first):
+        query = dict(equals or {})
+        ranked = False
+        if search:
+            search_filter, ranked = search_query(search, self.prefix_fields)
+            query.update(search_filter)
+        if since is not None:
+            query[self.since_field] = {"$gt": since}
+        if after is not None and not ranked:
+            query = keyset_query(query, after)
+        cursor = self.collection.find(query, self.projection)
+        if ranked:
+            cursor = cursor.sort(RANKED).skip(offset)
+        elif newest_first:
+            cursor = cursor.sort(NEWEST_FIRST)
+        if limit:
+            cursor = cursor.limit(limit)
+        return cursor
+
+    async def find(self, equals: Optional[dict] = None, *, search: Optional[str] = None, since: Optional[datetime] = None,
+                   after=None, offset: int = 0, limit: Optional[int] = None, newest_first: bool = True) -> List[dict]:
+        cursor = self._cursor(equals, search, since, after, offset, limit, newest_first)
+        return [self._load(doc) for doc in await cursor.to_list(limit)]
+
+    async def iterate(self, equals: Optional[dict] = None, *, search: Optional[str] = None, since: Optional[datetime] = None,
+                      after=None, offset: int = 0, limit: Optional[int] = None, newest_first: bool = True):
+        cursor = self._cursor(equals, search, since, after, offset, limit, newest_first).batch_size(BATCH_SIZE)
+        async for doc in cursor:
+            yield self._load(doc)
+
+class MotorRooms(MotorRepository):
+    async def catalog(self, equals: Optional[dict] = None, *, ids=None, min_price=None, max_price=None,
+                      sort=None, fields=None) -> List[dict]:
+        """Rooms in insertion order unless sorted; only ``fields`` when given."""
+        projection = {"_id": 0, **{field: 1 for field in fields}} if fields else self.projection
+        cursor = self.collection.find(catalog_query(equals, ids, min_price, max_price), projection)
+        if sort:
+            cursor = cursor.sort(sort)
+        return await cursor.to_list(None)
+
+    async def add_images(self, room_id: str, urls: List[str]) -> Optional[dict]:
+        """Append urls the room does not have yet; returns the updated room, or None."""
+        return await self.collection.find_one_and_update(
+            {"id": room_id},
+            {"$addToSet": {"images": {"$each": urls}}},
+            projection=self.projection,
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def _adjust_slots(self, query: dict, delta: int) -> Optional[dict]:
+        return await self.collection.find_one_and_update(
+            query,
+            [
+                {"$set": {"available_slots": {"$min": [{"$add": ["$available_slots", delta]}, "$total_slots"]}}},
+                {"$set": {"availability_status": AVAILABILITY_EXPR}},
+            ],
+            projection=self.projection,
+            return_document=ReturnDocument.BEFORE,
+        )
+
+    async def reserve_slot(self, room_id: str) -> Optional[dict]:
+        """Take one slot if any are left; returns the room as it was, or None."""
+        return await self._adjust_slots(
+            {"id": room_id, "available_slots": {"$gt": 0}, "availability_status": {"$ne": "fully_booked"}},
+            -1,
+        )
+
+    async def release_slots(self, room_id: str, count: int = 1) -> Optional[dict]:
+        """Give slots back without exceeding total_slots; returns the room as it was, or None."""
+        return await self._adjust_slots(
+            {"id": room_id, "$expr": {"$lt": ["$available_slots", "$total_slots"]}},
+            count,
+        )
+
+    async def available(self, first_month: datetime, last_month: datetime, equals: Optional[dict] = None,
+                        min_free: int = 1) -> List[dict]:
+        """Rooms with at least min_free beds in every month from first_month to last_month.
+
+        One aggregation: each room looks up its occupancy rows for the range
+        through the (room_id, month) index and keeps the busiest month, so the
+        cost grows with rooms times months rather than with bookings. The
+        $lookup form combining localField with a pipeline needs MongoDB 5.0.
+
+        free_beds comes from the bookings' dates alone. available_slots and
+        availability_status describe the room as it stands today and are not
+        consulted, so a room that is full now still shows for a later range.
+        """
+        inclusive = any(value for key, value in self.projection.items() if key != "_id")
+        project = {**self.projection, "free_beds": 1} if inclusive else {**self.projection, "occupancy": 0}
+        pipeline = [
+            {"$match": equals or {}},
+            {"$lookup": {
+                "from": OCCUPANCY_COLLECTION,
+                "localField": "id",
+                "foreignField": "room_id",
+                "pipeline": [
+                    {"$match": {"month": {"$gte": first_month, "$lte": last_month}}},
+                    {"$group": {"_id": None, "booked": {"$max": "$booked"}}},
+                ],
+                "as": "occupancy",
+            }},
+            {"$set": {"free_beds": {"$max": [0, {"$subtract": [
+                "$total_slots", {"$ifNull": [{"$arrayElemAt": ["$occupancy.booked", 0]}, 0]},
+            ]}]}}},
+            {"$match": {"free_beds": {"$gte": min_free}}},
+            {"$project": project},
+        ]
+        return await self.collection.aggregate(pipeline).to_list(None)
+
+class MotorOccupancy:
+    """Active bookings per room and calendar month, one document per pair."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def add(self, room_id: str, months: List[datetime], delta: int):
+        if not months or not delta:
+            return
+        await self.collection.bulk_write([
+            UpdateOne({"room_id": room_id, "month": month}, {"$inc": {"booked": delta}}, upsert=True)
+            for month in months
+        ], ordered=False)
+
+    async def replace(self, counts: Dict[tuple, int]):
+        """Swap in freshly computed {(room_id, month): booked} counts.
+
+        The counts are written to a side collection and renamed over the live
+        one, so readers never see a half-built table. An add() landing while
+        the side collection is built is lost in the swap, so the caller must
+        hold back occupancy writes from computing the counts until this
+        returns.
+        """
+        staging = self.collection.database[f"{self.collection.name}_rebuild"]
+        await staging.drop()
+        await staging.create_indexes(INDEXES[OCCUPANCY_COLLECTION])
+        docs = [{"room_id": room_id, "month": month, "booked": booked} for (room_id, month), booked in counts.items() if booked]
+        for i in range(0, len(docs), BATCH_SIZE):
+            await staging.insert_many(docs[i:i + BATCH_SIZE])
+        if docs:
+            await staging.rename(self.collection.name, dropTarget=True)
+        else:
+            await self.collection.delete_many({})
+
+class MotorBookings(MotorRepository):
+    async def set_status(self, booking_id: str, status: str, stamp: datetime, expected: Optional[str] = None) -> Optional[dict]:
+        """Change a booking's status; returns it as it was, or None if nothing changed.
+
+        Without ``expected`` any other status is replaced; with it the change
+        only applies while the booking still has that status.
+        """
+        current = {"$ne": status} if expected is None else expected
+        return self._load(await self.collection.find_one_and_update(
+            {"id": booking_id, "status": current},
+            {"$set": {"status": status, "updated_at": stamp}},
+            projection=self.projection,
+            return_document=ReturnDocument.BEFORE,
+        ))
+
+    async def set_statuses(self, changes: List[tuple], status: str, stamp: datetime) -> set:
+        """Apply (id, expected status) changes in one bulk_write; returns the ids that changed."""
+        if not changes:
+            return set()
+        result = await self.collection.bulk_write([
+            UpdateOne({"id": booking_id, "status": expected}, {"$set": {"status": status, "updated_at": stamp}})
+            for booking_id, expected in changes
+        ], ordered=False)
+        ids = [booking_id for booking_id, _ in changes]
+        if result.modified_count == len(changes):
+            return set(ids)
+        # Some bookings changed underneath us; the stamp shows which writes landed
+        landed = await self.collection.find(
+            {"id": {"$in": ids}, "status": status, "updated_at": stamp}, {"_id": 0, "id": 1}
+        ).to_list(len(ids))
+        return {doc['id'] for doc in landed}
+
+class MotorStorage:
+    def __init__(self, db, projections: Optional[dict] = None):
+        projections = projections or {}
+        self.rooms = MotorRooms(db.rooms, projections.get("rooms"))
+        self.bookings = MotorBookings(
+            db.bookings, projections.get("bookings"), prefix_fields=BOOKING_PREFIX_FIELDS, since_field="updated_at",
+            date_fields=BOOKING_DATE_FIELDS,
+        )
+        self.contact_messages = MotorRepository(
+            db.contact_messages, projections.get("contact_messages"), prefix_fields=CONTACT_PREFIX_FIELDS
+        )
+        self.admins = MotorRepository(db.admins, projections.get("admins"))
+        self.occupancy = MotorOccupancy(db[OCCUPANCY_COLLECTION])
+
+# ===================== IN MEMORY =====================
+
+EPOCH = datetime.min.replace(tzinfo=timezone.utc)
+WORD = re.compile(r"\w+")
+
+def _copy(doc: dict) -> dict:
+    return {key: list(value) if isinstance(value, list) else value for key, value in doc.items()}
+
+def _words(value) -> set:
+    return set(WORD.findall(str(value).lower())) if value is not None else set()
+
+class MemoryRepository:
+    """Records in a dict by id with hash indexes on ``indexed`` fields.
+
+    A sorted (created_at, id) list serves newest-first keyset pages and a
+    sorted (search key, id) list per prefix field serves prefix searches. Text
+    searches score every candidate against ``text_weights``. All methods
+    finish without yielding to the event loop, so each call is atomic.
+    """
+
+    def __init__(self, indexed=(), unique=(), prefix_fields=(), text_weights=None, since_field: str = "created_at",
+                 date_fields=()):
+        self.indexed = tuple(indexed) + tuple(f for f in unique if f not in indexed)
+        self.unique = tuple(unique)
+        self.prefix_fields = prefix_fields
+        self.text_weights = text_weights or {}
+        self.since_field = since_field
+        self.date_fields = tuple(date_fields)
+        self._docs = {}
+        self._indexes = {field: {} for field in self.indexed}
+        self._prefixes = {field: [] for field in prefix_fields}
+        self._order = []
+
+    def _load(self, doc: dict) -> dict:
+        return from_storage(_copy(doc), self.date_fields)
+
+    @staticmethod
+    def _order_key(doc: dict):
+        return (doc.get("created_at") or EPOCH, doc["id"])
+
+    def _add(self, doc: dict):
+        self._docs[doc["id"]] = doc
+        self._index(doc)
+
+    def _index(self, doc: dict):
+        for field, index in self._indexes.items():
+            index.setdefault(doc.get(field), set()).add(doc["id"])
+        for field, entries in self._prefixes.items():
+            key = doc.get(SEARCH_KEYS[field])
+            if key is not None:
+                bisect.insort(entries, (key, doc["id"]))
+        bisect.insort(self._order, self._order_key(doc))
+
+    def _remove(self, doc: dict):
+        del self._docs[doc["id"]]
+        self._unindex(doc)
+
+    def _unindex(self, doc: dict):
+        for field, index in self._indexes.items():
+            ids = index.get(doc.get(field))
+            ids.discard(doc["id"])
+            if not ids:
+                del index[doc.get(field)]
+        for field, entries in self._prefixes.items():
+            key = doc.get(SEARCH_KEYS[field])
+            if key is not None:
+                del entries[bisect.bisect_left(entries, (key, doc["id"]))]
+        del self._order[bisect.bisect_left(self._order, self._order_key(doc))]
+
+    def _check_unique(self, doc: dict, record_id: Optional[str] = None):
+        for field in self.unique:
+            if any(other != record_id for other in self._indexes[field].get(doc.get(field), ())):
+                raise DuplicateRecordError(f"{field} {doc.get(field)!r} already exists")
+
+    async def get(self, record_id: str) -> Optional[dict]:
+        doc = self._docs.get(record_id)
+        return self._load(doc) if doc is not None else None
+
+    async def exists(self, record_id: str) -> bool:
+        return record_id in self._docs
+
+    async def get_many(self, record_ids: List[str]) -> List[dict]:
+        return [self._load(self._docs[record_id]) for record_id in record_ids if record_id in self._docs]
+
+    async def get_by(self, field: str, value) -> Optional[dict]:
+        if field in self._indexes:
+            ids = self._indexes[field].get(value)
+            return self._load(self._docs[next(iter(ids))]) if ids else None
+        return next((self._load(doc) for doc in self._docs.values() if doc.get(field) == value), None)
+
+    async def insert(self, doc: dict):
+        if doc["id"] in self._docs:
+            raise DuplicateRecordError(f"id {doc['id']!r} already exists")
+        self._check_unique(doc)
+        self._add(to_storage(_copy(doc), self.prefix_fields))
+
+    async def insert_many(self, docs: Iterable[dict]):
+        for doc in docs:
+            await self.insert(doc)
+
+    async def upsert_many(self, docs: List[dict]) -> tuple:
+        inserted = updated = 0
+        for doc in docs:
+            existing = self._docs.get(doc["id"])
+            if existing is None:
+                await self.insert(doc)
+                inserted += 1
+            else:
+                self._swap(existing, to_storage(_copy(doc), self.prefix_fields))
+                updated += 1
+        return inserted, updated
+
+    def _swap(self, doc: dict, replacement: dict) -> dict:
+        self._check_unique(replacement, doc["id"])
+        # Assigning to the existing key keeps the record's insertion order
+        self._unindex(doc)
+        self._docs[doc["id"]] = replacement
+        self._index(replacement)
+        return replacement
+
+    def _replace(self, doc: dict, fields: dict) -> dict:
+        return self._swap(doc, {**doc, **fields})
+
+    async def update(self, record_id: str, fields: dict) -> Optional[dict]:
+        doc = self._docs.get(record_id)
+        if doc is None:
+            return None
+        return self._load(self._replace(doc, to_storage(_copy(fields), self.prefix_fields)))
+
+    async def delete(self, record_id: str) -> Optional[dict]:
+        doc = self._docs.get(record_id)
+        if doc is not None:
+            self._remove(doc)
+            return self._load(doc)
+        return None
+
+    def _matching_ids(self, equals: dict) -> Optional[set]:
+        """Ids satisfying the indexed part of equals, or None when nothing is indexed."""
+        ids = None
+        for field, value in equals.items():
+            if field in self._indexes:
+                matched = self._indexes[field].get(value, set())
+                ids = set(matched) if ids is None else ids & matched
+        return ids
+
+    async def count(self, **equals) -> int:
+        if not equals:
+            return len(self._docs)
+        ids = self._matching_ids(equals)
+        candidates = (self._docs[i] for i in ids) if ids is not None else self._docs.values()
+        return sum(1 for doc in candidates if all(doc.get(k) == v for k, v in equals.items()))
+
+    async def counts(self, field: Optional[str] = None, values=()) -> Dict[str, int]:
+        counts = {"total": len(self._docs)}
+        for value in values:
+            counts[value] = await self.count(**{field: value})
+        return counts
+
+    def ranks(self, search: Optional[str]) -> bool:
+        return bool(search) and prefix_field(search.strip(), self.prefix_fields) is None
+
+    def _select(self, equals, search, since, after, offset, limit, newest_first) -> List[dict]:
+        equals = equals or {}
+        ids = self._matching_ids(equals)
+        term = search.strip() if search else ""
+        field = prefix_field(term, self.prefix_fields) if term else None
+        if field is not None:
+            entries = self._prefixes[field]
+            prefix = search_key(field, term)
+            prefixed = set()
+            for value, record_id in entries[bisect.bisect_left(entries, (prefix, "")):]:
+                if not value.startswith(prefix):
+                    break
+                prefixed.add(record_id)
+            ids = prefixed if ids is None else ids & prefixed
+
+        def keep(doc):
+            if any(doc.get(k) != v for k, v in equals.items()):
+                return False
+            if since is not None and not (doc.get(self.since_field) and doc[self.since_field] > since):
+                return False
+            return True
+
+        if term and field is None:
+            words = _words(term)
+            scored = []
+            for doc in (self._docs[i] for i in ids) if ids is not None else self._docs.values():
+                score = sum(weight for name, weight in self.text_weights.items() if words & _words(doc.get(name)))
+                if score and keep(doc):
+                    scored.append((score, self._order_key(doc), doc))
+            scored.sort(key=lambda item: (item[0], item[1]), reverse=True)
+            docs = [doc for _, _, doc in scored[offset:]]
+        elif not newest_first:
+            docs = [doc for record_id, doc in self._docs.items() if (ids is None or record_id in ids) and keep(doc)]
+        else:
+            if ids is not None:
+                keys = sorted((self._order_key(self._docs[i]) for i in ids), reverse=True)
+                if after is not None:
+                    keys = [key for key in keys if key < tuple(after)]
+            else:
+                end = bisect.bisect_left(self._order, tuple(after)) if after is not None else len(self._order)
+                keys = (self._order[i] for i in range(end - 1, -1, -1))
+            docs = []
+            for key in keys:
+                doc = self._docs[key[1]]
+                if keep(doc):
+                    docs.append(doc)
+                    if limit and len(docs) >= limit:
+                        break
+        return [self._load(doc) for doc in (docs[:limit] if limit else docs)]
+
+    async def find(self, equals: Optional[dict] = None, *, search: Optional[str] = None, since: Optional[datetime] = None,
+                   after=None, offset: int = 0, limit: Optional[int] = None, newest_first: bool = True) -> List[dict]:
+        return self._select(equals, search, since, after, offset, limit, newest_first)
+
+    async def iterate(self, equals: Optional[dict] = None, *, search: Optional[str] = None, since: Optional[datetime] = None,
+                      after=None, offset: int = 0, limit: Optional[int] = None, newest_first: bool = True):
+        for doc in self._select(equals, search, since, after, offset, limit, newest_first):
+            yield doc
+
+class MemoryOccupancy:
+    def __init__(self):
+        self.booked = {}
+
+    async def add(self, room_id: str, months: List[datetime], delta: int):
+        for month in months:
+            self.booked[(room_id, month)] = self.booked.get((room_id, month), 0) + delta
+
+    async def replace(self, counts: Dict[tuple, int]):
+        self.booked = {key: booked for key, booked in counts.items() if booked}
+
+class MemoryRooms(MemoryRepository):
+    def __init__(self, occupancy: MemoryOccupancy, **kwargs):
+        super().__init__(**kwargs)
+        self.occupancy = occupancy
+
+    async def catalog(self, equals: Optional[dict] = None, *, ids=None, min_price=None, max_price=None,
+                      sort=None, fields=None) -> List[dict]:
+        if ids is not None:
+            wanted = set(ids)
+            rooms = [doc for record_id, doc in self._docs.items() if record_id in wanted]
+        else:
+            rooms = self._select(equals, None, None, None, 0, None, False)
+        equals = equals or {}
+        rooms = [
+            doc for doc in rooms
+            if all(doc.get(k) == v for k, v in equals.items())
+            and (min_price is None or doc.get("price", 0) >= min_price)
+            and (max_price is None or doc.get("price", 0) <= max_price)
+        ]
+        # Stable sorts applied from the last key to the first
+        for field, direction in reversed(sort or []):
+            rooms.sort(key=lambda doc: doc.get(field), reverse=direction < 0)
+        if fields:
+            rooms = [{field: doc[field] for field in fields if field in doc} for doc in rooms]
+        return [_copy(doc) for doc in rooms]
+
+    async def available(self, first_month: datetime, last_month: datetime, equals: Optional[dict] = None,
+                        min_free: int = 1) -> List[dict]:
+        months = stay_months(first_month, last_month + timedelta(days=1))
+        rooms = []
+        for room in self._select(equals, None, None, None, 0, None, False):
+            busiest = max((self.occupancy.booked.get((room["id"], month), 0) for month in months), default=0)
+            room["free_beds"] = max(0, room.get("total_slots", 0) - busiest)
+            if room["free_beds"] >= min_free:
+                rooms.append(room)
+        return rooms
+
+    async def add_images(self, room_id: str, urls: List[str]) -> Optional[dict]:
+        room = self._docs.get(room_id)
+        if room is None:
+            return None
+        images = list(room.get("images") or [])
+        images += [url for url in dict.fromkeys(urls) if url not in images]
+        return self._load(self._replace(room, {"images": images}))
+
+    def _adjust_slots(self, room: dict, delta: int) -> dict:
+        available_slots = min(room.get("available_slots", 0) + delta, room.get("total_slots", 0))
+        self._replace(room, {
+            "available_slots": available_slots,
+            "availability_status": derive_availability(available_slots, room.get("total_slots", 0)),
+        })
+        return _copy(room)
+
+    async def reserve_slot(self, room_id: str) -> Optional[dict]:
+        room = self._docs.get(room_id)
+        if room is None or room.get("available_slots", 0) <= 0 or room.get("availability_status") == "fully_booked":
+            return None
+        return self._adjust_slots(room, -1)
+
+    async def release_slots(self, room_id: str, count: int = 1) -> Optional[dict]:
+        room = self._docs.get(room_id)
+        if room is None or room.get("available_slots", 0) >= room.get("total_slots", 0):
+            return None
+        return self._adjust_slots(room, count)
+
+class MemoryBookings(MemoryRepository):
+    async def set_status(self, booking_id: str, status: str, stamp: datetime, expected: Optional[str] = None) -> Optional[dict]:
+        booking = self._docs.get(booking_id)
+        if booking is None:
+            return None
+        if expected is None and booking.get("status") == status:
+            return None
+        if expected is not None and booking.get("status") != expected:
+            return None
+        self._replace(booking, {"status": status, "updated_at": stamp})
+        return self._load(booking)
+
+    async def set_statuses(self, changes: List[tuple], status: str, stamp: datetime) -> set:
+        changed = set()
+        for booking_id, expected in changes:
+            if await self.set_status(booking_id, status, stamp, expected=expected) is not None:
+                changed.add(booking_id)
+        return changed
+
+class MemoryStorage:
+    def __init__(self):
+        self.occupancy = MemoryOccupancy()
+        self.rooms = MemoryRooms(self.occupancy, indexed=("room_type", "availability_status"))
+        self.bookings = MemoryBookings(
+            indexed=("status", "room_id", "email"),
+            prefix_fields=BOOKING_PREFIX_FIELDS,
+            text_weights=BOOKING_TEXT_WEIGHTS,
+            since_field="updated_at",
+            date_fields=BOOKING_DATE_FIELDS,
+        )
+        self.contact_messages = MemoryRepository(
+            indexed=("email",), prefix_fields=CONTACT_PREFIX_FIELDS, text_weights=CONTACT_TEXT_WEIGHTS
+        )
+        self.admins = MemoryRepository(unique=("email",))
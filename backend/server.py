@@ -1,36 +1,486 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, File, Header, Query, Request, Response, UploadFile, status
+from fastapi.responses import FileResponse, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.datastructures import Headers, MutableHeaders
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+from pymongo.monitoring import CommandListener
 import os
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, TypeAdapter, ValidationError, create_model, model_validator
 from typing import List, Optional
+from collections import OrderedDict, deque
 import uuid
-from datetime import datetime, timezone, timedelta
+from datetime import date, datetime, timezone, timedelta
 import jwt
 import bcrypt
 import asyncio
+import argparse
+import sys
+import time
+import hashlib
+import base64
+import json
+import functools
+import math
+import csv
+import io
+import bisect
+import contextlib
+import threading
+import zlib
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from repositories import (
+    BOOKING_PREFIX_FIELDS, CONTACT_PREFIX_FIELDS, INDEXES as STORAGE_INDEXES, NEWEST_FIRST, RANKED,
+    OCCUPANCY_COLLECTION, SEARCH_KEYS, DuplicateRecordError, MemoryStorage, MotorStorage, as_datetime,
+    derive_availability, from_storage, keyset_query, search_key, search_query, stay_months,
+)
+import images
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# ===================== METRICS =====================
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+def _labels(names, values) -> str:
+    pairs = []
+    for name, value in zip(names, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return ",".join(pairs)
+
+class MetricsRegistry:
+    """Request and Mongo command metrics rendered in Prometheus text format.
+
+    Recording is a dict lookup and a bisect. HTTP metrics are only touched from
+    the event loop; command events arrive on Motor's worker threads and take
+    a lock.
+    """
+
+    def __init__(self):
+        self.requests = {}
+        self.request_latency = {}
+        self.commands = {}
+        self.command_failures = {}
+        self.compression_bytes_in = {}
+        self.compression_bytes_out = {}
+        self._lock = threading.Lock()
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float):
+        key = (method, route, status_code)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.request_latency.get((method, route))
+        if histogram is None:
+            histogram = self.request_latency[(method, route)] = Histogram()
+        histogram.observe(seconds)
+
+    def observe_compression(self, encoding: str, bytes_in: int, bytes_out: int):
+        self.compression_bytes_in[(encoding,)] = self.compression_bytes_in.get((encoding,), 0) + bytes_in
+        self.compression_bytes_out[(encoding,)] = self.compression_bytes_out.get((encoding,), 0) + bytes_out
+
+    def observe_command(self, collection: str, command: str, seconds: float, failed: bool):
+        key = (collection, command)
+        with self._lock:
+            histogram = self.commands.get(key)
+            if histogram is None:
+                histogram = self.commands[key] = Histogram()
+            histogram.observe(seconds)
+            if failed:
+                self.command_failures[key] = self.command_failures.get(key, 0) + 1
+
+    @staticmethod
+    def _counter(lines, name, help_text, label_names, values: dict):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} counter")
+        for labels, value in sorted(values.items()):
+            lines.append(f"{name}{{{_labels(label_names, labels)}}} {value}")
+
+    @staticmethod
+    def _histogram(lines, name, help_text, label_names, histograms: dict):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in sorted(histograms.items()):
+            base = _labels(label_names, labels)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{base},le="{le}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{base}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{base}}} {cumulative}")
+
+    def render(self, extra_counters=()) -> str:
+        lines = []
+        self._counter(lines, "http_requests_total", "HTTP requests by route template and status code.",
+                      ("method", "route", "status"), self.requests)
+        self._histogram(lines, "http_request_duration_seconds", "HTTP request latency, including streamed bodies.",
+                        ("method", "route"), dict(self.request_latency))
+        self._counter(lines, "http_compression_input_bytes_total", "Response bytes before compression, by encoding.",
+                      ("encoding",), self.compression_bytes_in)
+        self._counter(lines, "http_compression_output_bytes_total", "Response bytes sent after compression, by encoding.",
+                      ("encoding",), self.compression_bytes_out)
+        with self._lock:
+            self._histogram(lines, "mongodb_command_duration_seconds", "MongoDB command round trips by collection and command.",
+                            ("collection", "command"), self.commands)
+            self._counter(lines, "mongodb_command_failures_total", "MongoDB commands that returned an error.",
+                          ("collection", "command"), self.command_failures)
+        for name, help_text, label_names, values in extra_counters:
+            self._counter(lines, name, help_text, label_names, values)
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+class MongoCommandMetrics(CommandListener):
+    """Times every command Motor sends, keyed by the collection it targets."""
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self._pending = {}
+
+    def started(self, event):
+        command = event.command
+        target = command.get("collection") if event.command_name == "getMore" else command.get(event.command_name)
+        collection = target if isinstance(target, str) else ""
+        self._pending[(event.connection_id, event.request_id)] = collection
+
+    def _finish(self, event, failed: bool):
+        collection = self._pending.pop((event.connection_id, event.request_id), "")
+        self.registry.observe_command(collection, event.command_name, event.duration_micros / 1e6, failed)
+
+    def succeeded(self, event):
+        self._finish(event, False)
+
+    def failed(self, event):
+        self._finish(event, True)
+
+class MetricsMiddleware:
+    """ASGI middleware recording count, status and latency per route template.
+
+    Labels use the matched route's path ("/api/rooms/{room_id}") so ids never
+    become label values; requests that match no route share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status_code,
+                time.perf_counter() - start,
+            )
+
+# ===================== COMPRESSION =====================
+
+try:
+    import brotli
+except ImportError:  # optional; without it only gzip is offered
+    brotli = None
+
+# text/event-stream is deliberately absent: compressors buffer, which would hold events back
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/plain", "text/csv", "text/html")
+
+def negotiate_encoding(accept_encoding: str, offered) -> Optional[str]:
+    """The offered coding the client weights highest; ties go to the earlier offer."""
+    weights = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        weight = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                weight = float(params[2:])
+            except ValueError:
+                weight = 0.0
+        weights[coding.strip()] = weight
+    best, best_weight = None, 0.0
+    for coding in offered:
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+class Compressor:
+    """Incremental gzip or brotli encoder with one interface."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._encoder = brotli.Compressor(mode=brotli.MODE_TEXT, quality=brotli_quality)
+        else:
+            # wbits 31 writes a gzip header with a zero mtime, so output is deterministic
+            self._encoder = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._encoder.process(data) if self.encoding == "br" else self._encoder.compress(data)
+
+    def finish(self) -> bytes:
+        return self._encoder.finish() if self.encoding == "br" else self._encoder.flush()
+
+class CompressionMiddleware:
+    """ASGI middleware compressing text responses with brotli or gzip.
+
+    The coding is negotiated from Accept-Encoding. Bodies are held back until
+    ``minimum_size`` bytes have arrived: anything smaller, 204/304s, already
+    encoded bodies, no-transform responses and event streams go out untouched.
+    Larger streamed bodies (NDJSON and CSV exports) are compressed chunk by
+    chunk without buffering the whole response.
+
+    A response with a strong ETag is fully determined by it, so its compressed
+    form is kept in a small LRU keyed by (ETag, coding) and repeat downloads of
+    the same room catalog skip the compressor. Compressed responses get a weak
+    ETag, which If-None-Match still matches.
+    """
+
+    def __init__(self, app, minimum_size: int, gzip_level: int, brotli_quality: int, cache_entries: int):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache_entries = cache_entries
+        self.offered = ("br", "gzip") if brotli is not None else ("gzip",)
+        self._cache = OrderedDict()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""), self.offered)
+        if encoding is None:
+            return await self.app(scope, receive, send)
+
+        start_message = None
+        pending = []
+        pending_size = 0
+        compressor = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, pending_size, compressor, passthrough
+            if passthrough:
+                return await send(message)
+
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                if self._eligible(message["status"], headers):
+                    start_message = message
+                    headers.add_vary_header("Accept-Encoding")
+                    return
+                if message["status"] == 304:
+                    # Caches revalidating a compressed 200 need the same Vary
+                    headers.add_vary_header("Accept-Encoding")
+                passthrough = True
+                return await send(message)
+            if message["type"] != "http.response.body":
+                return await send(message)
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                data = compressor.compress(body)
+                if not more_body:
+                    data += compressor.finish()
+                self._observe(compressor.encoding, len(body), len(data))
+                if data or not more_body:
+                    await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            pending.append(body)
+            pending_size += len(body)
+            if more_body and pending_size < self.minimum_size:
+                return
+            buffered = b"".join(pending)
+            pending.clear()
+            headers = MutableHeaders(raw=start_message["headers"])
+
+            if not more_body and pending_size < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                return await send({"type": "http.response.body", "body": buffered})
+
+            etag = headers.get("etag")
+            headers["Content-Encoding"] = encoding
+            if etag and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            if not more_body:
+                data = self._compress_whole(buffered, encoding, etag)
+                headers["Content-Length"] = str(len(data))
+                self._observe(encoding, len(buffered), len(data))
+                await send(start_message)
+                return await send({"type": "http.response.body", "body": data})
+
+            del headers["Content-Length"]
+            compressor = Compressor(encoding, self.gzip_level, self.brotli_quality)
+            data = compressor.compress(buffered)
+            self._observe(encoding, len(buffered), len(data))
+            await send(start_message)
+            await send({"type": "http.response.body", "body": data, "more_body": True})
+
+        await self.app(scope, receive, send_compressed)
+
+    def _eligible(self, status_code: int, headers) -> bool:
+        if status_code < 200 or status_code in (204, 304) or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", ""):
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    def _compress_whole(self, body: bytes, encoding: str, etag: Optional[str]) -> bytes:
+        key = (etag, encoding) if etag and not etag.startswith("W/") else None
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        compressor = Compressor(encoding, self.gzip_level, self.brotli_quality)
+        data = compressor.compress(body) + compressor.finish()
+        if key is not None and self.cache_entries > 0:
+            self._cache[key] = data
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+        return data
+
+    @staticmethod
+    def _observe(encoding: str, bytes_in: int, bytes_out: int):
+        metrics.observe_compression(encoding, bytes_in, bytes_out)
+
+# Storage Config
+# "memory" keeps rooms, bookings, contact messages and admins in process, for
+# tests and benchmarks; features that only exist in MongoDB are switched off
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')  # "mongo" or "memory"
+
+# MongoDB connection; with memory storage none is made and MONGO_URL is not needed
+client = None
+db = None
+if STORAGE_BACKEND == 'mongo':
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True, event_listeners=[MongoCommandMetrics(metrics)])
+    db = client[os.environ['DB_NAME']]
 
 # JWT Config
 JWT_SECRET = os.environ.get('JWT_SECRET', 'el-antiq-hostel-secret-key-2024')
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# Password hashing Config
+BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', '2'))
+PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', '16'))
+
+# Admin principal cache Config
+ADMIN_CACHE_TTL_SECONDS = float(os.environ.get('ADMIN_CACHE_TTL_SECONDS', '300'))
+ADMIN_CACHE_MAX_ENTRIES = int(os.environ.get('ADMIN_CACHE_MAX_ENTRIES', '1024'))
+
+# Live events Config
+EVENT_HISTORY_SIZE = int(os.environ.get('EVENT_HISTORY_SIZE', '1000'))
+EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', '256'))
+EVENT_HEARTBEAT_SECONDS = float(os.environ.get('EVENT_HEARTBEAT_SECONDS', '15'))
+EVENT_TICKET_TTL_SECONDS = float(os.environ.get('EVENT_TICKET_TTL_SECONDS', '30'))
+
+# Rate limiting Config
+RATE_LIMIT_BACKEND = os.environ.get('RATE_LIMIT_BACKEND', 'memory')  # "memory" or "off"
+RATE_LIMIT_MAX_KEYS = int(os.environ.get('RATE_LIMIT_MAX_KEYS', '10000'))
+# Use the address our reverse proxy appended to X-Forwarded-For; only enable behind one
+RATE_LIMIT_TRUST_FORWARDED = os.environ.get('RATE_LIMIT_TRUST_FORWARDED', 'false').lower() == 'true'
+BOOKING_RATE_PER_MINUTE = float(os.environ.get('BOOKING_RATE_PER_MINUTE', '5'))
+BOOKING_RATE_BURST = int(os.environ.get('BOOKING_RATE_BURST', '5'))
+CONTACT_RATE_PER_MINUTE = float(os.environ.get('CONTACT_RATE_PER_MINUTE', '3'))
+CONTACT_RATE_BURST = int(os.environ.get('CONTACT_RATE_BURST', '3'))
+
+# Idempotency Config
+IDEMPOTENCY_TTL = timedelta(seconds=float(os.environ.get('IDEMPOTENCY_TTL_SECONDS', '86400')))
+IDEMPOTENCY_LEASE = timedelta(seconds=float(os.environ.get('IDEMPOTENCY_LEASE_SECONDS', '60')))
+
 # Resend Config
 RESEND_API_KEY = os.environ.get('RESEND_API_KEY', '')
 SENDER_EMAIL = os.environ.get('SENDER_EMAIL', 'onboarding@resend.dev')
 ADMIN_EMAIL = os.environ.get('ADMIN_EMAIL', 'elantiqgroup.gh@gmail.com')
+EMAIL_SENDER = os.environ.get('EMAIL_SENDER', 'resend')  # "resend" or "stub"
+
+# Email outbox Config
+OUTBOX_BATCH_SIZE = int(os.environ.get('OUTBOX_BATCH_SIZE', '20'))
+OUTBOX_CONCURRENCY = int(os.environ.get('OUTBOX_CONCURRENCY', '4'))
+OUTBOX_MAX_ATTEMPTS = int(os.environ.get('OUTBOX_MAX_ATTEMPTS', '5'))
+OUTBOX_RETRY_BASE_SECONDS = float(os.environ.get('OUTBOX_RETRY_BASE_SECONDS', '30'))
+OUTBOX_LEASE_SECONDS = float(os.environ.get('OUTBOX_LEASE_SECONDS', '120'))
+OUTBOX_POLL_SECONDS = float(os.environ.get('OUTBOX_POLL_SECONDS', '5'))
+
+# Room catalog cache Config
+ROOM_CACHE_TTL_SECONDS = float(os.environ.get('ROOM_CACHE_TTL_SECONDS', '60'))
+ROOM_CACHE_MAX_ENTRIES = int(os.environ.get('ROOM_CACHE_MAX_ENTRIES', '1024'))
+ROOM_CACHE_CONTROL = os.environ.get('ROOM_CACHE_CONTROL', 'public, no-cache')
+
+# Bookings Config
+# Stay length assumed when a booking gives no move-out date (one academic year)
+DEFAULT_STAY_MONTHS = int(os.environ.get('DEFAULT_STAY_MONTHS', '9'))
+MAX_AVAILABILITY_MONTHS = int(os.environ.get('MAX_AVAILABILITY_MONTHS', '24'))
+
+# Admin dashboard Config
+DASHBOARD_SINCE_OVERLAP = timedelta(seconds=float(os.environ.get('DASHBOARD_SINCE_OVERLAP_SECONDS', '5')))
+
+# Stats Config
+STATS_COUNTERS_ENABLED = os.environ.get('STATS_COUNTERS', 'false').lower() == 'true' and STORAGE_BACKEND == 'mongo'
+
+# Serialization Config
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', 'false').lower() == 'true'
+
+# Compression Config
+COMPRESSION_ENABLED = os.environ.get('COMPRESSION_ENABLED', 'true').lower() == 'true'
+# Below this a compressed body saves less than the extra round of CPU costs
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+GZIP_LEVEL = int(os.environ.get('GZIP_LEVEL', '6'))
+BROTLI_QUALITY = int(os.environ.get('BROTLI_QUALITY', '5'))
+COMPRESSION_CACHE_ENTRIES = int(os.environ.get('COMPRESSION_CACHE_ENTRIES', '256'))
+
+# Room images Config
+UPLOAD_DIR = Path(os.environ.get('UPLOAD_DIR', str(ROOT_DIR / 'uploads')))
+IMAGE_MAX_UPLOAD_BYTES = int(os.environ.get('IMAGE_MAX_UPLOAD_BYTES', str(10 * 1024 * 1024)))
+IMAGE_MAX_FILES = int(os.environ.get('IMAGE_MAX_FILES', '10'))
+# Whole multipart request; by default every file at its limit plus room for the part headers
+IMAGE_MAX_REQUEST_BYTES = int(os.environ.get(
+    'IMAGE_MAX_REQUEST_BYTES', str(IMAGE_MAX_FILES * IMAGE_MAX_UPLOAD_BYTES + 64 * 1024)
+))
+IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+IMAGE_MAX_PENDING = int(os.environ.get('IMAGE_MAX_PENDING', '20'))
+IMAGE_FORMAT = os.environ.get('IMAGE_FORMAT', 'webp')  # "webp" or "jpeg"
+IMAGE_QUALITY = int(os.environ.get('IMAGE_QUALITY', '80'))
+# Longest edge per variant; existing files keep their size, so changing these only affects new uploads
+IMAGE_VARIANTS = {
+    "thumb": int(os.environ.get('IMAGE_THUMB_SIZE', '320')),
+    "card": int(os.environ.get('IMAGE_CARD_SIZE', '800')),
+    "full": int(os.environ.get('IMAGE_FULL_SIZE', '1920')),
+}
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 # Create the main app
 app = FastAPI(title="EL-ANTIQ Hostel API")
@@ -40,6 +490,7 @@ api_router = APIRouter(prefix="/api")
 
 # Security
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
 # Configure logging
 logging.basicConfig(
@@ -65,6 +516,9 @@ class Room(BaseModel):
     available_slots: int = 1
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
 
+class RoomAvailability(Room):
+    free_beds: int
+
 class RoomCreate(BaseModel):
     name: str
     room_type: str
@@ -99,9 +553,11 @@ class Booking(BaseModel):
     phone_number: str
     email: EmailStr
     school: str
-    preferred_move_in_date: str
+    preferred_move_in_date: date
+    move_out_date: Optional[date] = None
     status: str = "pending"  # "pending", "confirmed", "cancelled"
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: Optional[datetime] = None
 
 class BookingCreate(BaseModel):
     room_id: str
@@ -111,7 +567,18 @@ class BookingCreate(BaseModel):
     phone_number: str
     email: EmailStr
     school: str
-    preferred_move_in_date: str
+    preferred_move_in_date: date
+    move_out_date: Optional[date] = None
+
+    @model_validator(mode="after")
+    def check_stay(self):
+        if self.move_out_date is not None and self.move_out_date <= self.preferred_move_in_date:
+            raise ValueError("move_out_date must be after preferred_move_in_date")
+        return self
+
+class BookingStatusBulkUpdate(BaseModel):
+    booking_ids: List[str] = Field(min_length=1, max_length=500)
+    status: str
 
 class ContactMessage(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -149,11 +616,58 @@ class TokenResponse(BaseModel):
 
 # ===================== AUTH HELPERS =====================
 
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+class PasswordHasher:
+    """Runs bcrypt on a dedicated thread pool so it never blocks the event loop.
+
+    At most ``workers`` hashes run at once. Once ``max_pending`` calls are
+    running or queued, further calls fail fast with 503 instead of piling up
+    behind a login burst.
+    """
+
+    def __init__(self, workers: int, max_pending: int, rounds: int):
+        self.workers = workers
+        self.rounds = rounds
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = None
+
+    async def _run(self, fn, *args):
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many authentication requests, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        salt = bcrypt.gensalt(rounds=self.rounds)
+        hashed = await self._run(bcrypt.hashpw, password.encode('utf-8'), salt)
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        return await self._run(bcrypt.checkpw, password.encode('utf-8'), hashed.encode('utf-8'))
 
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+password_hasher = PasswordHasher(PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING, BCRYPT_ROUNDS)
+
+async def hash_password(password: str) -> str:
+    return await password_hasher.hash(password)
+
+async def verify_password(password: str, hashed: str) -> bool:
+    return await password_hasher.verify(password, hashed)
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
@@ -161,67 +675,1423 @@ def create_access_token(data: dict) -> str:
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
-async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+# Audience of event stream tickets; access tokens carry none, so neither can stand in for the other
+EVENT_TICKET_AUDIENCE = "admin-events"
+
+def create_event_ticket(admin_id: str) -> str:
+    expire = datetime.now(timezone.utc) + timedelta(seconds=EVENT_TICKET_TTL_SECONDS)
+    return jwt.encode({"sub": admin_id, "aud": EVENT_TICKET_AUDIENCE, "exp": expire}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+
+class AdminPrincipalCache:
+    """Bounded LRU of verified token -> admin record.
+
+    Entries live for at most ``ttl_seconds`` and never past the token's own
+    ``exp``. The signature is still checked on every request; only the admin
+    lookup is skipped. No route changes an admin record, so entries are
+    never invalidated; an edit made in the database shows once they expire.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, token: str) -> Optional[dict]:
+        entry = self._entries.get(token)
+        if entry is not None and entry[0] > time.time():
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[token]
+        self.misses += 1
+        return None
+
+    def set(self, token: str, admin: dict, token_exp: Optional[float]):
+        if self.max_entries <= 0 or self.ttl_seconds <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        self._entries[token] = (expires_at, admin)
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
+        }
+
+admin_cache = AdminPrincipalCache(ADMIN_CACHE_TTL_SECONDS, ADMIN_CACHE_MAX_ENTRIES)
+
+async def authenticate_token(token: str, audience: Optional[str] = None) -> dict:
     try:
-        payload = jwt.decode(credentials.credentials, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM], audience=audience)
         admin_id = payload.get("sub")
         if admin_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
-        admin = await db.admins.find_one({"id": admin_id}, {"_id": 0})
+        admin = admin_cache.get(token)
         if admin is None:
-            raise HTTPException(status_code=401, detail="Admin not found")
+            admin = await storage.admins.get(admin_id)
+            if admin is None:
+                raise HTTPException(status_code=401, detail="Admin not found")
+            admin.pop("password_hash", None)
+            admin_cache.set(token, admin, payload.get("exp"))
         return admin
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token expired")
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
 
-# ===================== EMAIL HELPER =====================
+async def get_current_admin(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    return await authenticate_token(credentials.credentials)
 
-async def send_booking_notification(booking: dict, room: dict):
-    if not RESEND_API_KEY:
-        logger.warning("RESEND_API_KEY not configured, skipping email notification")
-        return
-    
+# ===================== RATE LIMITING =====================
+
+def client_ip(request: Request) -> str:
+    if RATE_LIMIT_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+class MemoryTokenBuckets:
+    """Token buckets held in this process, bounded to ``max_keys`` by LRU.
+
+    A rate limit backend is anything with ``async take(key, rate, burst)``
+    returning 0 when a token was spent or the seconds until one is available,
+    and ``size()``. Evicting a bucket refills it, so under a flood of distinct
+    keys the limit errs on the side of admitting.
+    """
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            tokens -= 1
+            wait = 0.0
+        else:
+            wait = (1 - tokens) / rate
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+    def size(self) -> int:
+        return len(self._buckets)
+
+async def is_admin_request(request: Request) -> bool:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return False
     try:
+        await authenticate_token(token)
+    except HTTPException:
+        return False
+    return True
+
+class RateLimiter:
+    """Per-route, per-client admission control for unauthenticated writes.
+
+    limit() returns a route dependency, so a rejected request gets its 429
+    before the handler touches the database. Requests from a signed-in admin
+    and retries whose Idempotency-Key already has a stored response are
+    exempt: neither is the anonymous traffic the limit is there for, and a
+    replay does no work. Both checks run only for a request that would be
+    rejected, so admitted traffic pays for the token bucket alone.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.admitted = {}
+        self.shed = {}
+        self.exempt = {}
+
+    def limit(self, route: str, per_minute: float, burst: int):
+        self.admitted.setdefault(route, 0)
+        self.shed.setdefault(route, 0)
+        self.exempt.setdefault(route, 0)
+
+        async def dependency(request: Request):
+            if self.backend is None or per_minute <= 0:
+                return
+            wait = await self.backend.take(f"{route}:{client_ip(request)}", per_minute / 60, burst)
+            if wait and (await is_admin_request(request)
+                         or await has_stored_response(route, request.headers.get("idempotency-key"))):
+                self.exempt[route] += 1
+                return
+            if wait:
+                self.shed[route] += 1
+                raise HTTPException(
+                    status_code=429,
+                    detail="Too many requests, please try again later",
+                    headers={"Retry-After": str(math.ceil(wait))},
+                )
+            self.admitted[route] += 1
+
+        return dependency
+
+    def stats(self) -> dict:
+        return {
+            "backend": RATE_LIMIT_BACKEND,
+            "clients": self.backend.size() if self.backend is not None else 0,
+            "routes": {
+                route: {"admitted": self.admitted[route], "shed": self.shed[route], "exempt": self.exempt[route]}
+                for route in self.admitted
+            },
+        }
+
+rate_limiter = RateLimiter(MemoryTokenBuckets(RATE_LIMIT_MAX_KEYS) if RATE_LIMIT_BACKEND == 'memory' else None)
+
+# ===================== IDEMPOTENCY =====================
+
+def replay_response(record: dict) -> Response:
+    return Response(
+        content=record["body"],
+        status_code=record["status_code"],
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+async def has_stored_response(route: str, key: Optional[str]) -> bool:
+    """Whether run_idempotent would replay a stored response for this key."""
+    if not key or STORAGE_BACKEND != 'mongo':
+        return False
+    return await db.idempotency_keys.count_documents({"_id": f"{route}:{key}", "status": "done"}, limit=1) > 0
+
+async def save_idempotent_response(record_id: str, status_code: int, body: str):
+    now = datetime.now(timezone.utc)
+    try:
+        await db.idempotency_keys.update_one({"_id": record_id}, {"$set": {
+            "status": "done",
+            "status_code": status_code,
+            "body": body,
+            "expires_at": now + IDEMPOTENCY_TTL,
+        }})
+    except PyMongoError as e:
+        logger.error(f"Failed to store idempotent response for {record_id}: {str(e)}")
+
+async def run_idempotent(route: str, key: Optional[str], payload: BaseModel, handler):
+    """Run ``handler`` at most once per route and Idempotency-Key.
+
+    The unique ``_id`` insert is the claim, so of several concurrent requests
+    with the same key exactly one runs the handler; the others get 409 until
+    it finishes and the stored response from then on. A claim whose lease
+    ran out (the process died mid-request) can be taken over. Responses with
+    a 2xx or 4xx status are stored until the TTL index removes them; server
+    errors release the key so the client can retry. Keys are ignored with
+    in-memory storage.
+    """
+    if not key or STORAGE_BACKEND != 'mongo':
+        return await handler()
+
+    record_id = f"{route}:{key}"
+    request_hash = hashlib.sha256(payload.model_dump_json().encode('utf-8')).hexdigest()
+    now = datetime.now(timezone.utc)
+    try:
+        await db.idempotency_keys.insert_one({
+            "_id": record_id,
+            "request_hash": request_hash,
+            "status": "in_progress",
+            "created_at": now,
+            "expires_at": now + IDEMPOTENCY_LEASE,
+        })
+    except DuplicateKeyError:
+        record = await db.idempotency_keys.find_one({"_id": record_id})
+        if record is not None and record["request_hash"] != request_hash:
+            raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+        if record is not None and record["status"] == "done":
+            return replay_response(record)
+        taken = await db.idempotency_keys.find_one_and_update(
+            {"_id": record_id, "status": "in_progress", "expires_at": {"$lte": now}},
+            {"$set": {"expires_at": now + IDEMPOTENCY_LEASE}},
+        )
+        if taken is None:
+            raise HTTPException(
+                status_code=409,
+                detail="A request with this Idempotency-Key is still being processed",
+                headers={"Retry-After": "1"},
+            )
+
+    try:
+        result = await handler()
+    except HTTPException as e:
+        if e.status_code < 500:
+            await save_idempotent_response(record_id, e.status_code, json.dumps({"detail": e.detail}))
+        else:
+            await db.idempotency_keys.delete_one({"_id": record_id})
+        raise
+    except Exception:
+        await db.idempotency_keys.delete_one({"_id": record_id})
+        raise
+    await save_idempotent_response(record_id, 200, result.model_dump_json())
+    return result
+
+# ===================== LIVE EVENTS =====================
+
+class EventSubscriber:
+    def __init__(self, queue_size: int):
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+class EventBroker:
+    """In-process fan-out of change events to server-sent-event streams.
+
+    Event ids are ``<epoch>-<seq>``; the epoch changes on every restart. The
+    last ``history_size`` events are kept so a client reconnecting with
+    Last-Event-ID can resume. When its id is from another epoch or has fallen
+    out of the history, the client gets a ``reset`` event and should reload.
+    A subscriber whose queue fills up is cut off with a ``reset`` too, rather
+    than slowing down publishers. Events only reach streams served by the
+    process that handled the write.
+    """
+
+    def __init__(self, history_size: int, queue_size: int):
+        self.epoch = uuid.uuid4().hex[:8]
+        self.queue_size = queue_size
+        self.published = 0
+        self.dropped_subscribers = 0
+        self._seq = 0
+        self._history = deque(maxlen=history_size)
+        self._subscribers = set()
+
+    def publish(self, event_type: str, data: dict):
+        self._seq += 1
+        self.published += 1
+        event = (f"{self.epoch}-{self._seq}", self._seq, event_type, json.dumps(data, default=_json_default))
+        self._history.append(event)
+        for subscriber in list(self._subscribers):
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._evict(subscriber)
+
+    def _evict(self, subscriber: EventSubscriber):
+        self._subscribers.discard(subscriber)
+        self.dropped_subscribers += 1
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
+
+    def subscribe(self, last_event_id: Optional[str]):
+        """Register a subscriber and return it with the backlog to replay first.
+
+        The backlog is None when last_event_id cannot be resumed from.
+        """
+        subscriber = EventSubscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        if not last_event_id:
+            return subscriber, []
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return subscriber, None
+        seq = int(seq)
+        oldest = self._history[0][1] if self._history else self._seq + 1
+        if seq < oldest - 1:
+            return subscriber, None
+        return subscriber, [event for event in self._history if event[1] > seq]
+
+    def unsubscribe(self, subscriber: EventSubscriber):
+        self._subscribers.discard(subscriber)
+
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers,
+            "last_event_id": f"{self.epoch}-{self._seq}",
+        }
+
+event_broker = EventBroker(EVENT_HISTORY_SIZE, EVENT_QUEUE_SIZE)
+
+def sse_frame(event) -> bytes:
+    event_id, _, event_type, data = event
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n".encode('utf-8')
+
+async def sse_stream(request: Request, subscriber: EventSubscriber, backlog):
+    try:
+        yield b"retry: 3000\n\n"
+        if backlog is None:
+            yield b"event: reset\ndata: {}\n\n"
+            backlog = []
+        for event in backlog:
+            yield sse_frame(event)
+        while not await request.is_disconnected():
+            try:
+                event = await asyncio.wait_for(subscriber.queue.get(), timeout=EVENT_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            if event is None:
+                yield b"event: reset\ndata: {}\n\n"
+                break
+            yield sse_frame(event)
+    finally:
+        event_broker.unsubscribe(subscriber)
+
+# ===================== EMAIL OUTBOX =====================
+
+def render_booking_notification(booking: dict) -> dict:
+    html_content = f"""
+    <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
+        <h1 style="color: #0F172A; border-bottom: 2px solid #D4AF37; padding-bottom: 10px;">
+            New Booking Request - EL-ANTIQ Hostel
+        </h1>
+        <div style="background: #F8FAFC; padding: 20px; border-radius: 8px; margin: 20px 0;">
+            <h2 style="color: #0F172A; margin-top: 0;">Student Information</h2>
+            <p><strong>Name:</strong> {booking['full_name']}</p>
+            <p><strong>Phone:</strong> {booking['phone_number']}</p>
+            <p><strong>Email:</strong> {booking['email']}</p>
+            <p><strong>School:</strong> {booking['school']}</p>
+        </div>
+        <div style="background: #F8FAFC; padding: 20px; border-radius: 8px; margin: 20px 0;">
+            <h2 style="color: #0F172A; margin-top: 0;">Room Details</h2>
+            <p><strong>Room:</strong> {booking['room_name']}</p>
+            <p><strong>Type:</strong> {booking['room_type']}</p>
+            <p><strong>Preferred Move-in Date:</strong> {booking['preferred_move_in_date']}</p>
+            <p><strong>Move-out Date:</strong> {booking['move_out_date']}</p>
+        </div>
+        <p style="color: #64748B; font-size: 14px;">
+            Please contact the student to confirm their booking.
+        </p>
+    </div>
+    """
+    
+    return {
+        "from": SENDER_EMAIL,
+        "to": [ADMIN_EMAIL],
+        "subject": f"New Booking Request from {booking['full_name']}",
+        "html": html_content
+    }
+
+class ResendEmailSender:
+    configured = bool(RESEND_API_KEY)
+
+    async def send(self, params: dict) -> dict:
         import resend
         resend.api_key = RESEND_API_KEY
-        
-        html_content = f"""
-        <div style="font-family: Arial, sans-serif; max-width: 600px; margin: 0 auto; padding: 20px;">
-            <h1 style="color: #0F172A; border-bottom: 2px solid #D4AF37; padding-bottom: 10px;">
-                New Booking Request - EL-ANTIQ Hostel
-            </h1>
-            <div style="background: #F8FAFC; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                <h2 style="color: #0F172A; margin-top: 0;">Student Information</h2>
-                <p><strong>Name:</strong> {booking['full_name']}</p>
-                <p><strong>Phone:</strong> {booking['phone_number']}</p>
-                <p><strong>Email:</strong> {booking['email']}</p>
-                <p><strong>School:</strong> {booking['school']}</p>
-            </div>
-            <div style="background: #F8FAFC; padding: 20px; border-radius: 8px; margin: 20px 0;">
-                <h2 style="color: #0F172A; margin-top: 0;">Room Details</h2>
-                <p><strong>Room:</strong> {booking['room_name']}</p>
-                <p><strong>Type:</strong> {booking['room_type']}</p>
-                <p><strong>Preferred Move-in Date:</strong> {booking['preferred_move_in_date']}</p>
-            </div>
-            <p style="color: #64748B; font-size: 14px;">
-                Please contact the student to confirm their booking.
-            </p>
-        </div>
-        """
-        
-        params = {
-            "from": SENDER_EMAIL,
-            "to": [ADMIN_EMAIL],
-            "subject": f"New Booking Request from {booking['full_name']}",
-            "html": html_content
+        return await asyncio.to_thread(resend.Emails.send, params)
+
+class StubEmailSender:
+    """Records messages in memory instead of calling Resend; for tests and local runs."""
+    configured = True
+
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, params: dict) -> dict:
+        self.sent.append(params)
+        return {"id": f"stub-{uuid.uuid4()}"}
+
+email_sender = StubEmailSender() if EMAIL_SENDER == 'stub' else ResendEmailSender()
+
+def outbox_enabled() -> bool:
+    # start_outbox_worker logs once at startup when this is off
+    return STORAGE_BACKEND == 'mongo' and email_sender.configured
+
+async def enqueue_email(kind: str, params: dict, entry_id: Optional[str] = None):
+    """Persist an outgoing email; the outbox worker delivers it.
+
+    An entry_id already in the outbox means the email is queued; it is not
+    queued twice.
+    """
+    if not email_sender.configured:
+        logger.warning(f"RESEND_API_KEY not configured, skipping {kind} email")
+        return
+    if STORAGE_BACKEND != 'mongo':
+        return
+    now = datetime.now(timezone.utc)
+    try:
+        await db.email_outbox.insert_one({
+            "id": entry_id or str(uuid.uuid4()),
+            "kind": kind,
+            "params": params,
+            "status": "pending",
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+        })
+    except DuplicateKeyError:
+        return
+    outbox_worker.notify()
+
+async def queue_booking_notification(booking: dict):
+    """Queue the admin email for a booking stored with notification_pending, then clear the marker.
+
+    The outbox id is derived from the booking id, so the request and the
+    worker's sweep may both get here without the email going out twice.
+    """
+    await enqueue_email(
+        "booking_notification", render_booking_notification(booking), entry_id=f"booking:{booking['id']}",
+    )
+    await db.bookings.update_one({"id": booking['id']}, {"$unset": {"notification_pending": ""}})
+
+class OutboxWorker:
+    """Delivers email_outbox entries in the background.
+
+    Entries are claimed with a lease so a crashed worker's claims are picked up
+    again once the lease runs out. Failed sends are retried with exponential
+    backoff up to OUTBOX_MAX_ATTEMPTS, after which the entry is marked failed.
+    Each pass first queues the notifications of bookings still marked
+    notification_pending, whose request stopped before it could queue them.
+    """
+
+    def __init__(self, batch_size: int, concurrency: int, max_attempts: int, poll_seconds: float):
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.poll_seconds = poll_seconds
+        self.lease = timedelta(seconds=OUTBOX_LEASE_SECONDS)
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.swept = 0
+        self.total_send_seconds = 0.0
+        self.last_send_seconds = None
+        self._concurrency = concurrency
+        self._task = None
+        self._wakeup = None
+
+    def notify(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._wakeup = None
+
+    async def _claim(self) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        entry = await db.email_outbox.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "next_attempt_at": {"$lte": now}},
+                {"status": "sending", "locked_until": {"$lte": now}},
+            ]},
+            {"$set": {"status": "sending", "locked_until": now + self.lease}, "$inc": {"attempts": 1}},
+            projection={"_id": 0},
+            return_document=ReturnDocument.BEFORE,
+        )
+        if entry is not None:
+            entry['attempts'] += 1
+        return entry
+
+    async def _deliver(self, entry: dict, semaphore: asyncio.Semaphore):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await email_sender.send(entry['params'])
+            except Exception as e:
+                await self._record_failure(entry, str(e))
+                return
+            elapsed = time.perf_counter() - start
+        self.sent += 1
+        self.total_send_seconds += elapsed
+        self.last_send_seconds = elapsed
+        await db.email_outbox.update_one(
+            {"id": entry['id']},
+            {"$set": {
+                "status": "sent",
+                "sent_at": datetime.now(timezone.utc),
+                "provider_id": (result or {}).get('id'),
+                "send_ms": round(elapsed * 1000, 1),
+            }, "$unset": {"locked_until": ""}},
+        )
+        logger.info(f"{entry['kind']} email sent: {(result or {}).get('id')}")
+
+    async def _record_failure(self, entry: dict, error: str):
+        if entry['attempts'] >= self.max_attempts:
+            self.failed += 1
+            update = {"status": "failed", "last_error": error}
+            logger.error(f"Giving up on {entry['kind']} email {entry['id']}: {error}")
+        else:
+            self.retried += 1
+            delay = OUTBOX_RETRY_BASE_SECONDS * 2 ** (entry['attempts'] - 1)
+            update = {
+                "status": "pending",
+                "last_error": error,
+                "next_attempt_at": datetime.now(timezone.utc) + timedelta(seconds=delay),
+            }
+            logger.warning(f"Failed to send {entry['kind']} email, retrying in {delay:.0f}s: {error}")
+        await db.email_outbox.update_one({"id": entry['id']}, {"$set": update, "$unset": {"locked_until": ""}})
+
+    async def sweep_bookings(self) -> int:
+        """Queue notifications for up to batch_size bookings still marked pending."""
+        marked = await db.bookings.find({"notification_pending": True}, {"_id": 0, "id": 1}).to_list(self.batch_size)
+        bookings = await storage.bookings.get_many([doc['id'] for doc in marked])
+        for booking in bookings:
+            await queue_booking_notification(booking)
+        self.swept += len(bookings)
+        return len(bookings)
+
+    async def process_batch(self) -> int:
+        """Claim and deliver up to batch_size entries; returns how many were claimed."""
+        await self.sweep_bookings()
+        batch = []
+        while len(batch) < self.batch_size:
+            entry = await self._claim()
+            if entry is None:
+                break
+            batch.append(entry)
+        semaphore = asyncio.Semaphore(self._concurrency)
+        await asyncio.gather(*(self._deliver(entry, semaphore) for entry in batch))
+        return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                claimed = await self.process_batch()
+            except Exception as e:
+                # Keep the worker alive; back off so a persistent fault does not spin
+                logger.exception(f"Outbox worker error: {str(e)}")
+                await asyncio.sleep(self.poll_seconds)
+                continue
+            if claimed < self.batch_size:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def stats(self) -> dict:
+        by_status = await db.email_outbox.aggregate([
+            {"$group": {"_id": "$status", "n": {"$sum": 1}}}
+        ]).to_list(None)
+        counts = {row['_id']: row['n'] for row in by_status}
+        return {
+            "queue_depth": counts.get("pending", 0) + counts.get("sending", 0),
+            "by_status": counts,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "swept": self.swept,
+            "avg_send_ms": round(self.total_send_seconds / self.sent * 1000, 1) if self.sent else None,
+            "last_send_ms": round(self.last_send_seconds * 1000, 1) if self.last_send_seconds is not None else None,
+        }
+
+outbox_worker = OutboxWorker(OUTBOX_BATCH_SIZE, OUTBOX_CONCURRENCY, OUTBOX_MAX_ATTEMPTS, OUTBOX_POLL_SECONDS)
+
+# ===================== SERIALIZATION =====================
+
+try:
+    import orjson
+except ImportError:  # optional; fast serialization falls back to pydantic-core
+    orjson = None
+
+def model_projection(model) -> dict:
+    """Mongo projection returning exactly the fields a response model exposes."""
+    return {"_id": 0, **{name: 1 for name in model.model_fields}}
+
+@functools.lru_cache(maxsize=None)
+def list_adapter(model) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+def dump_trusted(docs, adapter: TypeAdapter) -> bytes:
+    """Serialize documents that were written through the models.
+
+    The documents are not revalidated one by one: with orjson installed they
+    are dumped as-is, otherwise pydantic-core validates and dumps the whole
+    batch in one call.
+    """
+    if orjson is not None:
+        return orjson.dumps(docs, option=orjson.OPT_UTC_Z)
+    return adapter.dump_json(adapter.validate_python(docs))
+
+def serialize_docs(docs, adapter: TypeAdapter) -> bytes:
+    if FAST_SERIALIZATION:
+        return dump_trusted(docs, adapter)
+    return adapter.dump_json(adapter.validate_python(docs))
+
+# ===================== PAGINATION =====================
+
+DEFAULT_PAGE_SIZE = 500
+MAX_PAGE_SIZE = 1000
+MAX_SEARCH_LENGTH = 100
+
+def encode_cursor(doc: dict) -> str:
+    created_at = doc['created_at']
+    if isinstance(created_at, datetime):
+        created_at = created_at.isoformat()
+    raw = json.dumps([created_at, doc['id']]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii')
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, doc_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        created_at = datetime.fromisoformat(created_at)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return created_at, doc_id
+
+def encode_offset_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps(offset).encode('utf-8')).decode('ascii')
+
+def decode_offset_cursor(cursor: str) -> int:
+    try:
+        offset = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if type(offset) is not int or offset < 0:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return offset
+
+def _json_default(value):
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+async def ndjson_lines(cursor):
+    async for doc in cursor:
+        if orjson is not None:
+            yield orjson.dumps(doc, option=orjson.OPT_UTC_Z | orjson.OPT_APPEND_NEWLINE)
+        else:
+            yield json.dumps(doc, default=_json_default).encode('utf-8') + b"\n"
+
+async def fetch_docs(repository, limit: int, equals: Optional[dict] = None, since: Optional[datetime] = None):
+    """Newest-first records, plus the cursor for the next page if any."""
+    docs = await repository.find(equals, since=since, limit=limit + 1)
+    if len(docs) > limit:
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1])
+    return docs, None
+
+async def fetch_page(repository, model, equals: dict, search: Optional[str], limit: Optional[int], after: Optional[str],
+                     format: Optional[str], response: Response):
+    """Run a newest-first keyset query as a JSON page or an NDJSON stream.
+
+    JSON pages hold at most ``limit`` documents; when more remain the cursor for
+    the next page is returned in the ``X-Next-Cursor`` header. NDJSON streams
+    straight from the repository and is unbounded unless ``limit`` is given.
+    Ranked text searches are ordered by relevance instead and page by offset,
+    since a text score cannot be used as a keyset.
+    """
+    search = search.strip() if search else None
+    ranked = repository.ranks(search)
+    offset, keyset = 0, None
+    if after and ranked:
+        offset = decode_offset_cursor(after)
+    elif after:
+        keyset = decode_cursor(after)
+
+    if format == "ndjson":
+        records = repository.iterate(equals, search=search, after=keyset, offset=offset, limit=limit)
+        return StreamingResponse(ndjson_lines(records), media_type="application/x-ndjson")
+    if format is not None:
+        raise HTTPException(status_code=400, detail="Invalid format")
+
+    page_size = limit or DEFAULT_PAGE_SIZE
+    docs = await repository.find(equals, search=search, after=keyset, offset=offset, limit=page_size + 1)
+    next_cursor = None
+    if len(docs) > page_size:
+        docs = docs[:page_size]
+        next_cursor = encode_offset_cursor(offset + page_size) if ranked else encode_cursor(docs[-1])
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if FAST_SERIALIZATION:
+        return Response(
+            content=dump_trusted(docs, list_adapter(model)),
+            media_type="application/json",
+            headers=dict(response.headers),
+        )
+    return docs
+
+# ===================== STORAGE =====================
+
+def create_storage():
+    if STORAGE_BACKEND == 'memory':
+        return MemoryStorage()
+    return MotorStorage(db, {
+        "rooms": model_projection(Room),
+        "bookings": model_projection(Booking),
+        "contact_messages": model_projection(ContactMessage),
+    })
+
+storage = create_storage()
+
+def require_mongo():
+    """Route dependency for admin tools that work on MongoDB collections directly."""
+    if STORAGE_BACKEND != 'mongo':
+        raise HTTPException(status_code=501, detail="Not available with in-memory storage")
+
+# ===================== IMPORT / EXPORT =====================
+
+IMPORT_BATCH_SIZE = 500
+MAX_IMPORT_ERRORS = 100
+
+# dataset name -> (collection name, model, field the status filter applies to)
+DATASETS = {
+    "rooms": ("rooms", Room, "availability_status"),
+    "bookings": ("bookings", Booking, "status"),
+    "contact": ("contact_messages", ContactMessage, None),
+}
+
+def get_dataset(dataset: str):
+    if dataset not in DATASETS:
+        raise HTTPException(status_code=404, detail="Unknown dataset")
+    return DATASETS[dataset]
+
+def _list_fields(model) -> set:
+    return {name for name, field in model.model_fields.items() if getattr(field.annotation, '__origin__', None) is list}
+
+def _csv_row(values: list) -> bytes:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue().encode('utf-8')
+
+async def stored_docs(cursor, date_fields):
+    """Raw cursor documents as a repository would return them."""
+    async for doc in cursor:
+        yield from_storage(doc, date_fields)
+
+async def csv_lines(cursor, model):
+    """Stream documents as CSV; list fields are written as JSON arrays."""
+    fields = list(model.model_fields)
+    list_fields = _list_fields(model)
+    yield _csv_row(fields)
+    async for doc in cursor:
+        row = []
+        for name in fields:
+            value = doc.get(name)
+            if name in list_fields and value is not None:
+                value = json.dumps(value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            row.append("" if value is None else value)
+        yield _csv_row(row)
+
+async def request_lines(request: Request):
+    """Decoded lines of a streamed request body, without buffering the whole body."""
+    remainder = b""
+    async for chunk in request.stream():
+        remainder += chunk
+        *lines, remainder = remainder.split(b"\n")
+        for line in lines:
+            yield line.decode('utf-8').rstrip("\r")
+    if remainder:
+        yield remainder.decode('utf-8').rstrip("\r")
+
+async def ndjson_records(request: Request):
+    line_number = 0
+    async for line in request_lines(request):
+        line_number += 1
+        if line.strip():
+            yield line_number, line
+
+async def csv_records(request: Request, model):
+    """Yield (line number, dict) for each CSV record, joining quoted multi-line fields."""
+    list_fields = _list_fields(model)
+    header = None
+    record, start_line, line_number = "", 0, 0
+    async for line in request_lines(request):
+        line_number += 1
+        if not record:
+            start_line = line_number
+        record = f"{record}\n{line}" if record else line
+        # A complete record has balanced quotes
+        if record.count('"') % 2:
+            continue
+        values = next(csv.reader([record]), [])
+        record = ""
+        if not any(values):
+            continue
+        if header is None:
+            header = values
+            continue
+        row = {}
+        for name, value in zip(header, values):
+            if value == "":
+                continue
+            if name in list_fields:
+                try:
+                    value = json.loads(value)
+                except ValueError:
+                    pass  # left as a string so validation reports the field
+            row[name] = value
+        yield start_line, row
+
+def _import_error(e: ValueError) -> str:
+    if isinstance(e, ValidationError):
+        return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+    return str(e)
+
+async def import_dataset(request: Request, repository, model, format: str) -> dict:
+    """Validate streamed records and upsert them by id in batches."""
+    summary = {"received": 0, "inserted": 0, "updated": 0, "errors": []}
+    batch = []
+
+    async def flush():
+        if batch:
+            inserted, updated = await repository.upsert_many(batch)
+            summary["inserted"] += inserted
+            summary["updated"] += updated
+            batch.clear()
+
+    records = ndjson_records(request) if format == "ndjson" else csv_records(request, model)
+    async for line_number, record in records:
+        summary["received"] += 1
+        try:
+            if isinstance(record, str):
+                record = json.loads(record)
+            doc = model.model_validate(record).model_dump()
+        except ValueError as e:
+            if len(summary["errors"]) < MAX_IMPORT_ERRORS:
+                summary["errors"].append({"line": line_number, "error": _import_error(e)})
+            continue
+        batch.append(doc)
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await flush()
+    await flush()
+    summary["failed"] = summary["received"] - summary["inserted"] - summary["updated"]
+    return summary
+
+# ===================== INDEXES =====================
+
+# Index manifest applied at startup. Every filter/sort used by the routes below
+# should be covered here; QUERY_PLANS lists those shapes so check_query_plans()
+# can prove none of them falls back to a collection scan.
+INDEXES = {
+    **STORAGE_INDEXES,
+    "bookings": STORAGE_INDEXES["bookings"] + [
+        # Only bookings whose notification has not been queued yet are indexed
+        IndexModel([("notification_pending", ASCENDING)], name="notification_pending",
+                   partialFilterExpression={"notification_pending": True}),
+    ],
+    "email_outbox": [
+        IndexModel([("id", ASCENDING)], unique=True, name="id_unique"),
+        IndexModel([("status", ASCENDING), ("next_attempt_at", ASCENDING)], name="status_next_attempt_at"),
+        IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)], name="status_locked_until"),
+    ],
+    "idempotency_keys": [
+        IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+    ],
+}
+
+# (label, collection, filter, sort) for every indexed query a route issues.
+# Unfiltered, unsorted reads such as the full room catalog are scans by design
+# and are left out.
+QUERY_PLANS = [
+    ("get_room", "rooms", {"id": ""}, None),
+    ("get_rooms?room_type", "rooms", {"room_type": ""}, None),
+    ("get_rooms?availability", "rooms", {"availability_status": ""}, None),
+    ("get_rooms?room_type&availability", "rooms", {"room_type": "", "availability_status": ""}, None),
+    ("get_rooms?ids", "rooms", {"id": {"$in": [""]}}, None),
+    ("get_rooms?min_price&max_price", "rooms", {"price": {"$gte": 0, "$lte": 0}}, None),
+    ("get_rooms?room_type&max_price", "rooms", {"room_type": "", "price": {"$lte": 0}}, None),
+    ("get_rooms?sort=price", "rooms", {}, [("price", ASCENDING), ("id", ASCENDING)]),
+    ("get_rooms?sort=-price", "rooms", {}, [("price", DESCENDING), ("id", DESCENDING)]),
+    ("get_rooms?room_type&sort=price", "rooms", {"room_type": ""}, [("price", ASCENDING), ("id", ASCENDING)]),
+    ("get_rooms?sort=name", "rooms", {}, [("name", ASCENDING), ("id", ASCENDING)]),
+    ("get_rooms?sort=created_at", "rooms", {}, [("created_at", ASCENDING), ("id", ASCENDING)]),
+    ("get_bookings", "bookings", {}, NEWEST_FIRST),
+    ("get_bookings?status", "bookings", {"status": ""}, NEWEST_FIRST),
+    ("get_bookings?after", "bookings", keyset_query({}, (datetime.min, "")), NEWEST_FIRST),
+    ("get_bookings?status&after", "bookings", keyset_query({"status": ""}, (datetime.min, "")), NEWEST_FIRST),
+    ("get_bookings?search=email", "bookings", search_query("a@", BOOKING_PREFIX_FIELDS)[0], NEWEST_FIRST),
+    ("get_bookings?search=phone", "bookings", search_query("055", BOOKING_PREFIX_FIELDS)[0], NEWEST_FIRST),
+    ("get_bookings?search=text", "bookings", search_query("name", BOOKING_PREFIX_FIELDS)[0], RANKED),
+    ("update_booking_status", "bookings", {"id": ""}, None),
+    ("get_contact_messages", "contact_messages", {}, NEWEST_FIRST),
+    ("get_contact_messages?after", "contact_messages", keyset_query({}, (datetime.min, "")), NEWEST_FIRST),
+    ("get_contact_messages?search=email", "contact_messages", search_query("a@", CONTACT_PREFIX_FIELDS)[0], NEWEST_FIRST),
+    ("get_contact_messages?search=text", "contact_messages", search_query("name", CONTACT_PREFIX_FIELDS)[0], RANKED),
+    ("admin_dashboard?since:bookings", "bookings", {"updated_at": {"$gt": datetime.min}}, NEWEST_FIRST),
+    ("admin_dashboard?since:messages", "contact_messages", {"created_at": {"$gt": datetime.min}}, NEWEST_FIRST),
+    ("get_available_rooms:occupancy", OCCUPANCY_COLLECTION, {"room_id": "", "month": {"$gte": datetime.min, "$lte": datetime.min}}, None),
+    ("get_current_admin", "admins", {"id": ""}, None),
+    ("admin_login", "admins", {"email": ""}, None),
+    ("outbox_worker:sweep", "bookings", {"notification_pending": True}, None),
+    ("outbox_worker:claim", "email_outbox", {"$or": [
+        {"status": "pending", "next_attempt_at": {"$lte": datetime.min}},
+        {"status": "sending", "locked_until": {"$lte": datetime.min}},
+    ]}, None),
+    ("get_stats:available_rooms", "rooms", {"availability_status": "available"}, None),
+    ("get_stats:pending_bookings", "bookings", {"status": "pending"}, None),
+    ("get_stats:confirmed_bookings", "bookings", {"status": "confirmed"}, None),
+]
+
+# IndexOptionsConflict, IndexKeySpecsConflict: an index exists under this name with another definition
+INDEX_CONFLICT_CODES = (85, 86)
+
+async def ensure_indexes(rebuild: bool = False):
+    """Create missing indexes.
+
+    An index whose stored definition differs from the manifest is only
+    reported, since rebuilding it leaves the collection without it for the
+    duration (a unique index stops guarding). The check-indexes command
+    passes rebuild=True to drop and recreate such indexes.
+    """
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            name = index.document["name"]
+            try:
+                try:
+                    await db[collection].create_indexes([index])
+                except OperationFailure as e:
+                    if e.code not in INDEX_CONFLICT_CODES:
+                        raise
+                    if not rebuild:
+                        logger.warning(
+                            f"Index {collection}.{name} differs from its definition; run check-indexes to rebuild it"
+                        )
+                        continue
+                    logger.warning(f"Rebuilding index {collection}.{name} with its new definition")
+                    await db[collection].drop_index(name)
+                    await db[collection].create_indexes([index])
+            except PyMongoError as e:
+                logger.error(f"Failed to create index {collection}.{name}: {str(e)}")
+
+def _plan_stages(plan: dict):
+    yield plan.get("stage")
+    for key in ("inputStage", "queryPlan"):
+        if isinstance(plan.get(key), dict):
+            yield from _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        yield from _plan_stages(child)
+
+async def check_query_plans() -> List[str]:
+    """Explain every query in QUERY_PLANS and return the labels that COLLSCAN."""
+    collscans = []
+    for label, collection, query, sort in QUERY_PLANS:
+        cursor = db[collection].find(query, {"_id": 0})
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        winning_plan = explain.get("queryPlanner", {}).get("winningPlan", {})
+        if "COLLSCAN" in _plan_stages(winning_plan):
+            collscans.append(label)
+    return collscans
+
+# ===================== ROOM CATALOG CACHE =====================
+
+class RoomCatalogCache:
+    """Serialized room catalog responses keyed by filter or room id.
+
+    Room writes call invalidate() explicitly; the TTL only bounds staleness for
+    changes made outside this process. A read that started before an
+    invalidation does not store its (possibly stale) result. Each entry keeps
+    the strong ETag of its body so conditional requests can be answered
+    without touching the database.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.version = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1], entry[2]
+        self.misses += 1
+        return None
+
+    def set(self, key, body: bytes, etag: str, version: int):
+        if version == self.version and self.ttl_seconds > 0 and self.max_entries > 0:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, body, etag)
+            # Filter combinations are open-ended, so drop the oldest entries past the cap
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+
+    def invalidate(self):
+        self.version += 1
+        self.invalidations += 1
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "invalidations": self.invalidations,
+            "ttl_seconds": self.ttl_seconds,
+            "max_entries": self.max_entries,
         }
-        
-        email = await asyncio.to_thread(resend.Emails.send, params)
-        logger.info(f"Booking notification email sent: {email.get('id')}")
-    except Exception as e:
-        logger.error(f"Failed to send booking notification: {str(e)}")
+
+room_cache = RoomCatalogCache(ROOM_CACHE_TTL_SECONDS, ROOM_CACHE_MAX_ENTRIES)
+room_list_adapter = list_adapter(Room)
+room_adapter = TypeAdapter(Room)
+
+MAX_ROOM_IDS = 100
+
+# sort= values for the room list; id breaks ties so the order is stable
+ROOM_SORTS = {
+    "price": [("price", ASCENDING), ("id", ASCENDING)],
+    "-price": [("price", DESCENDING), ("id", DESCENDING)],
+    "name": [("name", ASCENDING), ("id", ASCENDING)],
+    "-name": [("name", DESCENDING), ("id", DESCENDING)],
+    "created_at": [("created_at", ASCENDING), ("id", ASCENDING)],
+    "-created_at": [("created_at", DESCENDING), ("id", DESCENDING)],
+}
+
+@functools.lru_cache(maxsize=None)
+def room_fields_adapter(fields: tuple) -> TypeAdapter:
+    """List adapter for rooms projected down to fields."""
+    partial = create_model(
+        "RoomFields",
+        __config__=ConfigDict(extra="ignore"),
+        **{name: (Room.model_fields[name].annotation, Room.model_fields[name]) for name in fields},
+    )
+    return TypeAdapter(List[partial])
+
+def parse_room_fields(fields: Optional[str]) -> Optional[tuple]:
+    """Validated, sorted field names from a fields= list; id is always included."""
+    if not fields:
+        return None
+    names = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = names - set(Room.model_fields)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown room fields: {', '.join(sorted(unknown))}")
+    return tuple(sorted(names | {"id"}))
+
+def parse_room_ids(ids: Optional[str]) -> Optional[tuple]:
+    if ids is None:
+        return None
+    room_ids = tuple(sorted({room_id.strip() for room_id in ids.split(",") if room_id.strip()}))
+    if len(room_ids) > MAX_ROOM_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_ROOM_IDS} ids per request")
+    return room_ids
+
+async def load_room_catalog(
+    room_type: Optional[str] = None,
+    availability: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    sort: Optional[str] = None,
+    fields: Optional[tuple] = None,
+    ids: Optional[tuple] = None,
+):
+    """Serialized room list and its ETag, from the cache when possible.
+
+    fields and ids must already be normalized (sorted tuples) so equivalent
+    requests share a cache entry.
+    """
+    cache_key = ("rooms", room_type or None, availability or None, min_price, max_price, sort, fields, ids)
+    cached = room_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    version = room_cache.version
+    equals = {}
+    if room_type:
+        equals["room_type"] = room_type
+    if availability:
+        equals["availability_status"] = availability
+
+    rooms = await storage.rooms.catalog(
+        equals, ids=ids, min_price=min_price, max_price=max_price, sort=ROOM_SORTS.get(sort), fields=fields
+    )
+    body = serialize_docs(rooms, room_fields_adapter(fields) if fields else room_list_adapter)
+    etag = compute_etag(body)
+    room_cache.set(cache_key, body, etag, version)
+    return body, etag
+
+def compute_etag(body: bytes) -> str:
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so a W/ prefix still matches
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+def catalog_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    headers = {"ETag": etag, "Cache-Control": ROOM_CACHE_CONTROL}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# ===================== STATS =====================
+
+STATS_COUNTERS_ID = "dashboard"
+BOOKING_STATUS_COUNTERS = {"pending": "pending_bookings", "confirmed": "confirmed_bookings"}
+
+async def compute_stats() -> dict:
+    """Count everything with indexed count queries, run concurrently."""
+    rooms, bookings, messages = await asyncio.gather(
+        storage.rooms.counts("availability_status", ["available"]),
+        storage.bookings.counts("status", ["pending", "confirmed"]),
+        storage.contact_messages.counts(),
+    )
+    return {
+        "total_rooms": rooms["total"],
+        "available_rooms": rooms["available"],
+        "total_bookings": bookings["total"],
+        "pending_bookings": bookings["pending"],
+        "confirmed_bookings": bookings["confirmed"],
+        "total_messages": messages["total"],
+    }
+
+async def rebuild_stats_counters() -> dict:
+    stats = await compute_stats()
+    await db.stats_counters.replace_one({"_id": STATS_COUNTERS_ID}, stats, upsert=True)
+    return stats
+
+async def bump_stats(deltas: dict):
+    """Apply counter deltas from a write path when materialized counters are on."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if STATS_COUNTERS_ENABLED and deltas:
+        await db.stats_counters.update_one({"_id": STATS_COUNTERS_ID}, {"$inc": deltas}, upsert=True)
+
+def room_status_deltas(old_status: Optional[str], new_status: Optional[str]) -> dict:
+    return {"available_rooms": int(new_status == "available") - int(old_status == "available")}
+
+def booking_status_deltas(old_status: Optional[str], new_status: Optional[str]) -> dict:
+    deltas = {}
+    if old_status in BOOKING_STATUS_COUNTERS:
+        deltas[BOOKING_STATUS_COUNTERS[old_status]] = -1
+    if new_status in BOOKING_STATUS_COUNTERS:
+        key = BOOKING_STATUS_COUNTERS[new_status]
+        deltas[key] = deltas.get(key, 0) + 1
+    return deltas
+
+# ===================== SLOT ACCOUNTING =====================
+
+async def _after_slot_change(before: Optional[dict], delta: int) -> Optional[dict]:
+    """Invalidate, count and announce a slot change; before is the room prior to it."""
+    if before is not None:
+        room_cache.invalidate()
+        total_slots = before.get('total_slots', 0)
+        available_slots = min(before.get('available_slots', 0) + delta, total_slots)
+        new_status = derive_availability(available_slots, total_slots)
+        await bump_stats(room_status_deltas(before.get('availability_status'), new_status))
+        event_broker.publish("room.updated", {
+            "id": before['id'],
+            "available_slots": available_slots,
+            "availability_status": new_status,
+        })
+    return before
+
+async def reserve_slot(room_id: str) -> Optional[dict]:
+    """Take one slot if the room has any left; returns the room or None when full."""
+    return await _after_slot_change(await storage.rooms.reserve_slot(room_id), -1)
+
+async def release_slot(room_id: str, count: int = 1) -> Optional[dict]:
+    """Give slots back, never exceeding total_slots."""
+    return await _after_slot_change(await storage.rooms.release_slots(room_id, count), count)
+
+# ===================== OCCUPANCY =====================
+
+def add_months(value: date, months: int) -> date:
+    """value shifted by whole months, clamped to the end of shorter months."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    for day in (value.day, 30, 29, 28):
+        try:
+            return value.replace(year=year, month=month, day=day)
+        except ValueError:
+            continue
+
+def booking_months(booking: dict) -> List[datetime]:
+    """Calendar months a booking occupies a bed in; empty for unmigrated string dates."""
+    move_in = booking.get('preferred_move_in_date')
+    if not isinstance(move_in, date):
+        return []
+    move_out = booking.get('move_out_date') or add_months(move_in, DEFAULT_STAY_MONTHS)
+    return stay_months(move_in, move_out)
+
+class BookingWriteGate:
+    """Keeps booking writes and occupancy rebuilds from overlapping.
+
+    Any number of booking writes may hold the gate at once. A rebuild waits
+    for the writes in flight and holds new ones back until the recomputed
+    table has been swapped in; otherwise a booking counted by the rebuild's
+    scan could be counted again, or one made after the scan lost, when the
+    table is replaced. Only writes served by this process are held back.
+    """
+
+    def __init__(self):
+        self.waits = 0
+        self._writers = 0
+        self._rebuilding = False
+        self._condition = None
+
+    def _changed(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    @contextlib.asynccontextmanager
+    async def write(self):
+        condition = self._changed()
+        async with condition:
+            if self._rebuilding:
+                self.waits += 1
+                await condition.wait_for(lambda: not self._rebuilding)
+            self._writers += 1
+        try:
+            yield
+        finally:
+            async with condition:
+                self._writers -= 1
+                condition.notify_all()
+
+    @contextlib.asynccontextmanager
+    async def rebuild(self):
+        condition = self._changed()
+        async with condition:
+            await condition.wait_for(lambda: not self._rebuilding)
+            self._rebuilding = True
+            await condition.wait_for(lambda: self._writers == 0)
+        try:
+            yield
+        finally:
+            async with condition:
+                self._rebuilding = False
+                condition.notify_all()
+
+booking_writes = BookingWriteGate()
+
+async def occupy(booking: dict, delta: int):
+    """Count (+1) or uncount (-1) a booking in its room's monthly occupancy."""
+    await storage.occupancy.add(booking['room_id'], booking_months(booking), delta)
+
+async def rebuild_occupancy() -> int:
+    """Recompute monthly occupancy from every active booking; returns how many were counted.
+
+    Booking writes in this process wait until the rebuild is done. The
+    rebuild-occupancy command cannot pause a running server, so run it while
+    the server is stopped.
+    """
+    async with booking_writes.rebuild():
+        counts, counted = {}, 0
+        async for booking in storage.bookings.iterate(newest_first=False):
+            if booking.get('status') == "cancelled":
+                continue
+            counted += 1
+            for month in booking_months(booking):
+                counts[(booking['room_id'], month)] = counts.get((booking['room_id'], month), 0) + 1
+        await storage.occupancy.replace(counts)
+    return counted
+
+BOOKING_STATUSES = ["pending", "confirmed", "cancelled"]
+
+def slot_delta(old_status: Optional[str], new_status: str) -> int:
+    """Slots a booking status change gives back (+1) or needs (-1)."""
+    if new_status == "cancelled" and old_status != "cancelled":
+        return 1
+    if old_status == "cancelled" and new_status != "cancelled":
+        return -1
+    return 0
+
+# ===================== ROOM IMAGES =====================
+
+IMAGE_NAME = re.compile(r"^[0-9a-f]{32}-(?:%s)\.(?:webp|jpeg)$" % "|".join(IMAGE_VARIANTS))
+
+class ImageProcessor:
+    """Stores uploads and renders their variants in a process pool.
+
+    Decoding and resizing a phone photo takes far longer than a request should
+    hold the event loop, and Pillow keeps the GIL for much of it, so the work
+    runs in separate processes. Like the password hasher, a bounded number of
+    jobs may be queued; past that uploads get a 503.
+    """
+
+    def __init__(self, directory: Path, workers: int, max_pending: int):
+        self.directory = directory
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self._executor = None
+
+    async def store(self, data: bytes) -> dict:
+        """Variant URLs for an uploaded image, rendering them on first upload."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many image uploads in progress, please retry shortly",
+                headers={"Retry-After": "5"},
+            )
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        self.pending += 1
+        try:
+            names = await asyncio.get_running_loop().run_in_executor(
+                self._executor, images.render_variants,
+                data, str(self.directory), digest, IMAGE_VARIANTS, IMAGE_FORMAT, IMAGE_QUALITY,
+            )
+        except images.InvalidImageError as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        finally:
+            self.pending -= 1
+        return {variant: f"/api/images/{name}" for variant, name in names.items()}
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+image_processor = ImageProcessor(UPLOAD_DIR, IMAGE_WORKERS, IMAGE_MAX_PENDING)
+
+async def read_upload(upload: UploadFile) -> bytes:
+    if upload.content_type and not upload.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail=f"{upload.filename} is not an image")
+    data = await upload.read(IMAGE_MAX_UPLOAD_BYTES + 1)
+    if len(data) > IMAGE_MAX_UPLOAD_BYTES:
+        raise HTTPException(status_code=413, detail=f"{upload.filename} is larger than {IMAGE_MAX_UPLOAD_BYTES} bytes")
+    if not data:
+        raise HTTPException(status_code=400, detail=f"{upload.filename} is empty")
+    return data
+
+IMAGE_UPLOAD_PATH = re.compile(r"^/api/rooms/[^/]+/images$")
+
+class UploadSizeMiddleware:
+    """Answers 413 to image uploads whose Content-Length is over the limit.
+
+    FastAPI spools the whole multipart body before the handler runs, so the
+    per-file check in read_upload only happens after an oversized request
+    has been received in full; this turns it away before it is read.
+    """
+
+    def __init__(self, app, max_bytes: int):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and IMAGE_UPLOAD_PATH.match(scope["path"]):
+            length = Headers(scope=scope).get("content-length")
+            if length is not None and length.isdigit() and int(length) > self.max_bytes:
+                response = Response(
+                    content=json.dumps({"detail": f"Uploads are limited to {self.max_bytes} bytes per request"}),
+                    status_code=413,
+                    media_type="application/json",
+                    headers={"Connection": "close"},
+                )
+                return await response(scope, receive, send)
+        await self.app(scope, receive, send)
 
 # ===================== ROUTES =====================
 
@@ -232,143 +2102,352 @@ async def root():
 # ----- ROOMS -----
 
 @api_router.get("/rooms", response_model=List[Room])
-async def get_rooms(room_type: Optional[str] = None, availability: Optional[str] = None):
-    query = {}
-    if room_type:
-        query["room_type"] = room_type
-    if availability:
-        query["availability_status"] = availability
-    
-    rooms = await db.rooms.find(query, {"_id": 0}).to_list(100)
-    for room in rooms:
-        if isinstance(room.get('created_at'), str):
-            room['created_at'] = datetime.fromisoformat(room['created_at'])
-    return rooms
+async def get_rooms(
+    room_type: Optional[str] = None,
+    availability: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    sort: Optional[str] = None,
+    fields: Optional[str] = None,
+    ids: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+):
+    """List rooms, optionally filtered, sorted and trimmed to a comma-separated fields= list.
+
+    ids= fetches a comma-separated batch of rooms in one query. Without sort=
+    rooms come back in the order they were added.
+    """
+    if sort is not None and sort not in ROOM_SORTS:
+        raise HTTPException(status_code=400, detail=f"sort must be one of: {', '.join(ROOM_SORTS)}")
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price must not exceed max_price")
+    catalog = await load_room_catalog(
+        room_type, availability, min_price, max_price, sort, parse_room_fields(fields), parse_room_ids(ids)
+    )
+    return catalog_response(*catalog, if_none_match)
+
+@api_router.get("/rooms/available", response_model=List[RoomAvailability])
+async def get_available_rooms(
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    room_type: Optional[str] = None,
+    min_beds: int = Query(1, ge=1),
+):
+    """Rooms with at least min_beds free in every calendar month from `from` up to `to`.
+
+    Occupancy is tracked per month, so a stay that touches a month counts
+    against the whole of it. The answer depends on the bookings' dates only;
+    it is not capped by the room's current available_slots.
+    """
+    if end <= start:
+        raise HTTPException(status_code=400, detail="'to' must be after 'from'")
+    months = stay_months(start, end)
+    if len(months) > MAX_AVAILABILITY_MONTHS:
+        raise HTTPException(status_code=400, detail=f"Date range may span at most {MAX_AVAILABILITY_MONTHS} months")
+
+    equals = {"room_type": room_type} if room_type else {}
+    rooms = await storage.rooms.available(months[0], months[-1], equals, min_beds)
+    return Response(content=serialize_docs(rooms, list_adapter(RoomAvailability)), media_type="application/json")
 
 @api_router.get("/rooms/{room_id}", response_model=Room)
-async def get_room(room_id: str):
-    room = await db.rooms.find_one({"id": room_id}, {"_id": 0})
+async def get_room(room_id: str, if_none_match: Optional[str] = Header(None)):
+    cache_key = ("room", room_id)
+    cached = room_cache.get(cache_key)
+    if cached is not None:
+        return catalog_response(*cached, if_none_match)
+
+    version = room_cache.version
+    room = await storage.rooms.get(room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
-    if isinstance(room.get('created_at'), str):
-        room['created_at'] = datetime.fromisoformat(room['created_at'])
-    return room
+    body = serialize_docs(room, room_adapter)
+    etag = compute_etag(body)
+    room_cache.set(cache_key, body, etag, version)
+    return catalog_response(body, etag, if_none_match)
 
 @api_router.post("/rooms", response_model=Room)
 async def create_room(room_data: RoomCreate, admin: dict = Depends(get_current_admin)):
     room = Room(**room_data.model_dump())
-    doc = room.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.rooms.insert_one(doc)
+    await storage.rooms.insert(room.model_dump())
+    room_cache.invalidate()
+    await bump_stats({"total_rooms": 1, **room_status_deltas(None, room.availability_status)})
+    event_broker.publish("room.created", room.model_dump(mode="json"))
     return room
 
 @api_router.put("/rooms/{room_id}", response_model=Room)
 async def update_room(room_id: str, room_data: RoomUpdate, admin: dict = Depends(get_current_admin)):
-    existing = await db.rooms.find_one({"id": room_id}, {"_id": 0})
+    existing = await storage.rooms.get(room_id)
     if not existing:
         raise HTTPException(status_code=404, detail="Room not found")
-    
+
     update_data = {k: v for k, v in room_data.model_dump().items() if v is not None}
-    if update_data:
-        await db.rooms.update_one({"id": room_id}, {"$set": update_data})
-    
-    updated = await db.rooms.find_one({"id": room_id}, {"_id": 0})
-    if isinstance(updated.get('created_at'), str):
-        updated['created_at'] = datetime.fromisoformat(updated['created_at'])
+    if not update_data:
+        return existing
+
+    updated = await storage.rooms.update(room_id, update_data)
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Room not found")
+    room_cache.invalidate()
+    if 'availability_status' in update_data:
+        await bump_stats(room_status_deltas(existing.get('availability_status'), update_data['availability_status']))
+    event_broker.publish("room.updated", updated)
     return updated
 
 @api_router.delete("/rooms/{room_id}")
 async def delete_room(room_id: str, admin: dict = Depends(get_current_admin)):
-    result = await db.rooms.delete_one({"id": room_id})
-    if result.deleted_count == 0:
+    deleted = await storage.rooms.delete(room_id)
+    if deleted is None:
         raise HTTPException(status_code=404, detail="Room not found")
+    room_cache.invalidate()
+    await bump_stats({"total_rooms": -1, **room_status_deltas(deleted.get('availability_status'), None)})
+    event_broker.publish("room.deleted", {"id": room_id})
     return {"message": "Room deleted successfully"}
 
-# ----- BOOKINGS -----
+@api_router.post("/rooms/{room_id}/images", response_model=Room)
+async def upload_room_images(
+    room_id: str,
+    files: List[UploadFile] = File(...),
+    admin: dict = Depends(get_current_admin),
+):
+    """Add uploaded photos to a room.
 
-@api_router.post("/bookings", response_model=Booking)
-async def create_booking(booking_data: BookingCreate):
-    room = await db.rooms.find_one({"id": booking_data.room_id}, {"_id": 0})
-    if not room:
+    Each upload is resized once into thumb, card and full variants; the
+    room's ``images`` gains the full variant's URL, and the others differ only
+    by the variant name in it. Re-uploading the same file reuses its variants.
+    """
+    if images.Image is None:
+        raise HTTPException(status_code=501, detail="Image uploads need Pillow installed")
+    if len(files) > IMAGE_MAX_FILES:
+        raise HTTPException(status_code=400, detail=f"At most {IMAGE_MAX_FILES} images per upload")
+    if not await storage.rooms.exists(room_id):
         raise HTTPException(status_code=404, detail="Room not found")
+
+    uploads = [await read_upload(upload) for upload in files]
+    variants = await asyncio.gather(*(image_processor.store(data) for data in uploads))
+
+    # Appended atomically, so concurrent uploads to the same room keep each other's images
+    updated = await storage.rooms.add_images(room_id, list(dict.fromkeys(urls["full"] for urls in variants)))
+    if updated is None:
+        raise HTTPException(status_code=404, detail="Room not found")
+    room_cache.invalidate()
+    event_broker.publish("room.updated", updated)
+    return updated
+
+@api_router.get("/images/{name}", include_in_schema=False)
+async def get_image(name: str):
+    """Uploaded image variants; names are content hashes, so they never change."""
+    path = UPLOAD_DIR / name
+    if not IMAGE_NAME.match(name) or not path.is_file():
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, headers={"Cache-Control": IMAGE_CACHE_CONTROL})
+
+# ----- BOOKINGS -----
+
+@api_router.post(
+    "/bookings",
+    response_model=Booking,
+    dependencies=[Depends(rate_limiter.limit("bookings", BOOKING_RATE_PER_MINUTE, BOOKING_RATE_BURST))],
+)
+async def create_booking(booking_data: BookingCreate, idempotency_key: Optional[str] = Header(None, max_length=255)):
+    return await run_idempotent("bookings", idempotency_key, booking_data, lambda: insert_booking(booking_data))
+
+async def insert_booking(booking_data: BookingCreate) -> Booking:
+    async with booking_writes.write():
+        room = await reserve_slot(booking_data.room_id)
+        if room is None:
+            if not await storage.rooms.exists(booking_data.room_id):
+                raise HTTPException(status_code=404, detail="Room not found")
+            raise HTTPException(status_code=400, detail="Room is fully booked")
     
-    if room.get('availability_status') == 'fully_booked':
-        raise HTTPException(status_code=400, detail="Room is fully booked")
-    
-    booking = Booking(**booking_data.model_dump())
-    doc = booking.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.bookings.insert_one(doc)
+        booking = Booking(**booking_data.model_dump())
+        booking.updated_at = booking.created_at
+        if booking.move_out_date is None:
+            booking.move_out_date = add_months(booking.preferred_move_in_date, DEFAULT_STAY_MONTHS)
+        doc = booking.model_dump()
+        if outbox_enabled():
+            # Stored with the booking, so the email survives a failure to queue it below
+            doc["notification_pending"] = True
+        try:
+            await storage.bookings.insert(doc)
+        except Exception:
+            await release_slot(booking.room_id)
+            raise
+        await occupy(doc, 1)
+        await bump_stats({"total_bookings": 1, **booking_status_deltas(None, booking.status)})
+        event_broker.publish("booking.created", booking.model_dump(mode="json"))
     
-    # Send email notification
-    asyncio.create_task(send_booking_notification(doc, room))
+    # The booking stands either way; failing here would make a retry book a second slot
+    if doc.get("notification_pending"):
+        try:
+            await queue_booking_notification(doc)
+        except Exception as e:
+            logger.warning(f"Notification email for booking {booking.id} left to the outbox sweep: {str(e)}")
     
     return booking
 
 @api_router.get("/bookings", response_model=List[Booking])
-async def get_bookings(status: Optional[str] = None, admin: dict = Depends(get_current_admin)):
-    query = {}
+async def get_bookings(
+    response: Response,
+    status: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    format: Optional[str] = None,
+    search: Optional[str] = Query(None, max_length=MAX_SEARCH_LENGTH),
+    admin: dict = Depends(get_current_admin),
+):
+    equals = {}
     if status:
-        query["status"] = status
-    
-    bookings = await db.bookings.find(query, {"_id": 0}).sort("created_at", -1).to_list(500)
-    for booking in bookings:
-        if isinstance(booking.get('created_at'), str):
-            booking['created_at'] = datetime.fromisoformat(booking['created_at'])
-    return bookings
+        equals["status"] = status
+
+    return await fetch_page(storage.bookings, Booking, equals, search, limit, after, format, response)
 
 @api_router.put("/bookings/{booking_id}/status")
 async def update_booking_status(booking_id: str, status: str, admin: dict = Depends(get_current_admin)):
-    if status not in ["pending", "confirmed", "cancelled"]:
+    if status not in BOOKING_STATUSES:
         raise HTTPException(status_code=400, detail="Invalid status")
     
-    result = await db.bookings.update_one({"id": booking_id}, {"$set": {"status": status}})
-    if result.modified_count == 0:
-        raise HTTPException(status_code=404, detail="Booking not found")
-    return {"message": f"Booking status updated to {status}"}
+    async with booking_writes.write():
+        previous = await storage.bookings.set_status(booking_id, status, datetime.now(timezone.utc))
+        if previous is None:
+            raise HTTPException(status_code=404, detail="Booking not found")
+    
+        # Cancelling frees the slot; reinstating a cancelled booking needs one back
+        delta = slot_delta(previous.get('status'), status)
+        if delta > 0:
+            await release_slot(previous['room_id'])
+        elif delta < 0 and await reserve_slot(previous['room_id']) is None:
+            await storage.bookings.set_status(booking_id, "cancelled", datetime.now(timezone.utc), expected=status)
+            raise HTTPException(status_code=400, detail="Room is fully booked")
+        if delta:
+            await occupy(previous, -delta)
+    
+        await bump_stats(booking_status_deltas(previous.get('status'), status))
+        event_broker.publish("booking.status_changed", {
+            "id": booking_id,
+            "room_id": previous['room_id'],
+            "status": status,
+            "previous_status": previous.get('status'),
+        })
+        return {"message": f"Booking status updated to {status}"}
+
+@api_router.put("/bookings/status")
+async def bulk_update_booking_status(update: BookingStatusBulkUpdate, admin: dict = Depends(get_current_admin)):
+    """Move many bookings to one status with a single bulk write.
+
+    Each id gets a result: "updated", "unchanged", "not_found", or
+    "room_fully_booked" when reinstating a cancelled booking finds no slot.
+    Slots are accounted for exactly as in update_booking_status.
+    """
+    status = update.status
+    if status not in BOOKING_STATUSES:
+        raise HTTPException(status_code=400, detail="Invalid status")
+    
+    async with booking_writes.write():
+        booking_ids = list(dict.fromkeys(update.booking_ids))
+        previous = {doc['id']: doc for doc in await storage.bookings.get_many(booking_ids)}
+        results = {booking_id: "not_found" for booking_id in booking_ids}
+    
+        # Reinstated bookings must win a slot before their status changes
+        pending_changes = []
+        for booking_id, doc in previous.items():
+            if doc.get('status') == status:
+                results[booking_id] = "unchanged"
+            elif slot_delta(doc.get('status'), status) < 0 and await reserve_slot(doc['room_id']) is None:
+                results[booking_id] = "room_fully_booked"
+            else:
+                pending_changes.append(doc)
+    
+        landed_ids = await storage.bookings.set_statuses(
+            [(doc['id'], doc.get('status')) for doc in pending_changes], status, datetime.now(timezone.utc)
+        )
+        applied = [doc for doc in pending_changes if doc['id'] in landed_ids]
+        # Bookings that changed underneath us keep their status and any slot they won
+        for doc in pending_changes:
+            if doc['id'] not in landed_ids:
+                results[doc['id']] = "unchanged"
+                if slot_delta(doc.get('status'), status) < 0:
+                    await release_slot(doc['room_id'])
+    
+        released = {}
+        deltas = {}
+        for doc in applied:
+            results[doc['id']] = "updated"
+            event_broker.publish("booking.status_changed", {
+                "id": doc['id'],
+                "room_id": doc['room_id'],
+                "status": status,
+                "previous_status": doc.get('status'),
+            })
+            delta = slot_delta(doc.get('status'), status)
+            if delta:
+                await occupy(doc, -delta)
+            if delta > 0:
+                released[doc['room_id']] = released.get(doc['room_id'], 0) + 1
+            for key, value in booking_status_deltas(doc.get('status'), status).items():
+                deltas[key] = deltas.get(key, 0) + value
+        for room_id, count in released.items():
+            await release_slot(room_id, count)
+        await bump_stats(deltas)
+    
+        return {
+            "status": status,
+            "updated": len(applied),
+            "results": [{"id": booking_id, "result": results[booking_id]} for booking_id in booking_ids],
+        }
 
 # ----- CONTACT -----
 
-@api_router.post("/contact", response_model=ContactMessage)
-async def create_contact_message(message_data: ContactMessageCreate):
+@api_router.post(
+    "/contact",
+    response_model=ContactMessage,
+    dependencies=[Depends(rate_limiter.limit("contact", CONTACT_RATE_PER_MINUTE, CONTACT_RATE_BURST))],
+)
+async def create_contact_message(message_data: ContactMessageCreate, idempotency_key: Optional[str] = Header(None, max_length=255)):
+    return await run_idempotent("contact", idempotency_key, message_data, lambda: insert_contact_message(message_data))
+
+async def insert_contact_message(message_data: ContactMessageCreate) -> ContactMessage:
     message = ContactMessage(**message_data.model_dump())
-    doc = message.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.contact_messages.insert_one(doc)
+    await storage.contact_messages.insert(message.model_dump())
+    await bump_stats({"total_messages": 1})
+    event_broker.publish("contact.received", message.model_dump(mode="json"))
     return message
 
 @api_router.get("/contact", response_model=List[ContactMessage])
-async def get_contact_messages(admin: dict = Depends(get_current_admin)):
-    messages = await db.contact_messages.find({}, {"_id": 0}).sort("created_at", -1).to_list(500)
-    for msg in messages:
-        if isinstance(msg.get('created_at'), str):
-            msg['created_at'] = datetime.fromisoformat(msg['created_at'])
-    return messages
+async def get_contact_messages(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    after: Optional[str] = None,
+    format: Optional[str] = None,
+    search: Optional[str] = Query(None, max_length=MAX_SEARCH_LENGTH),
+    admin: dict = Depends(get_current_admin),
+):
+    return await fetch_page(storage.contact_messages, ContactMessage, {}, search, limit, after, format, response)
 
 # ----- ADMIN AUTH -----
 
 @api_router.post("/admin/register", response_model=TokenResponse)
 async def admin_register(admin_data: AdminRegister):
-    existing = await db.admins.find_one({"email": admin_data.email}, {"_id": 0})
+    existing = await storage.admins.get_by("email", admin_data.email)
     if existing:
         raise HTTPException(status_code=400, detail="Admin with this email already exists")
     
     admin = AdminUser(
         email=admin_data.email,
-        password_hash=hash_password(admin_data.password),
+        password_hash=await hash_password(admin_data.password),
         name=admin_data.name
     )
-    doc = admin.model_dump()
-    doc['created_at'] = doc['created_at'].isoformat()
-    await db.admins.insert_one(doc)
+    try:
+        await storage.admins.insert(admin.model_dump())
+    except DuplicateRecordError:
+        raise HTTPException(status_code=400, detail="Admin with this email already exists")
     
     access_token = create_access_token({"sub": admin.id})
     return TokenResponse(access_token=access_token)
 
 @api_router.post("/admin/login", response_model=TokenResponse)
 async def admin_login(login_data: AdminLogin):
-    admin = await db.admins.find_one({"email": login_data.email}, {"_id": 0})
-    if not admin or not verify_password(login_data.password, admin['password_hash']):
+    admin = await storage.admins.get_by("email", login_data.email)
+    if not admin or not await verify_password(login_data.password, admin['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid email or password")
     
     access_token = create_access_token({"sub": admin['id']})
@@ -378,32 +2457,173 @@ async def admin_login(login_data: AdminLogin):
 async def get_admin_profile(admin: dict = Depends(get_current_admin)):
     return {"id": admin['id'], "email": admin['email'], "name": admin['name']}
 
+@api_router.get("/admin/dashboard")
+async def get_admin_dashboard(
+    since: Optional[datetime] = None,
+    rooms_etag: Optional[str] = None,
+    admin: dict = Depends(get_current_admin),
+):
+    """Everything the admin dashboard shows, fetched concurrently in one request.
+
+    Pass the previous response's ``server_time`` as ``since`` to receive only
+    bookings changed and messages received after it, and its ``rooms_etag`` to
+    get ``rooms: null`` when the catalog is unchanged.
+    """
+    server_time = datetime.now(timezone.utc)
+    if since is not None:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # Overlap so writes stamped just before the previous sync are not missed
+        since = since - DASHBOARD_SINCE_OVERLAP
+
+    # Bookings are matched on updated_at and messages on created_at
+    stats, (rooms_body, etag), (bookings, bookings_cursor), (messages, messages_cursor) = await asyncio.gather(
+        get_stats(admin),
+        load_room_catalog(),
+        fetch_docs(storage.bookings, DEFAULT_PAGE_SIZE, since=since),
+        fetch_docs(storage.contact_messages, DEFAULT_PAGE_SIZE, since=since),
+    )
+
+    # Splice the pre-serialized parts together rather than re-encoding the catalog
+    parts = {
+        "stats": json.dumps(stats).encode('utf-8'),
+        "rooms": b"null" if etag_matches(rooms_etag, etag) else rooms_body,
+        "rooms_etag": json.dumps(etag).encode('utf-8'),
+        "bookings": serialize_docs(bookings, list_adapter(Booking)),
+        "bookings_next_cursor": json.dumps(bookings_cursor).encode('utf-8'),
+        "messages": serialize_docs(messages, list_adapter(ContactMessage)),
+        "messages_next_cursor": json.dumps(messages_cursor).encode('utf-8'),
+        "server_time": json.dumps(server_time.isoformat().replace("+00:00", "Z")).encode('utf-8'),
+    }
+    body = b"{" + b",".join(b'"%s":%s' % (key.encode('utf-8'), value) for key, value in parts.items()) + b"}"
+    return Response(content=body, media_type="application/json")
+
+@api_router.get("/admin/export/{dataset}", dependencies=[Depends(require_mongo)])
+async def export_dataset(
+    dataset: str,
+    format: str = "ndjson",
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    admin: dict = Depends(get_current_admin),
+):
+    """Stream rooms, bookings or contact messages as NDJSON or CSV."""
+    collection_name, model, status_field = get_dataset(dataset)
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Invalid format")
+    
+    query = {}
+    if status:
+        if status_field is None:
+            raise HTTPException(status_code=400, detail=f"{dataset} cannot be filtered by status")
+        query[status_field] = status
+    if created_from or created_to:
+        query["created_at"] = {}
+        if created_from:
+            query["created_at"]["$gte"] = created_from
+        if created_to:
+            query["created_at"]["$lt"] = created_to
+    
+    cursor = stored_docs(
+        db[collection_name].find(query, model_projection(model)).sort(NEWEST_FIRST).batch_size(DEFAULT_PAGE_SIZE),
+        getattr(storage, collection_name).date_fields,
+    )
+    filename = f"{dataset}-{datetime.now(timezone.utc):%Y%m%d%H%M%S}.{format}"
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+    if format == "csv":
+        return StreamingResponse(csv_lines(cursor, model), media_type="text/csv", headers=headers)
+    return StreamingResponse(ndjson_lines(cursor), media_type="application/x-ndjson", headers=headers)
+
+@api_router.post("/admin/import/{dataset}")
+async def import_data(dataset: str, request: Request, format: str = "ndjson", admin: dict = Depends(get_current_admin)):
+    """Upsert rooms, bookings or contact messages by id from an NDJSON or CSV body.
+
+    Records are applied as-is: importing bookings does not move room slots,
+    but monthly occupancy is rebuilt from the imported bookings.
+    """
+    collection_name, model, _ = get_dataset(dataset)
+    if format not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="Invalid format")
+    
+    summary = await import_dataset(request, getattr(storage, collection_name), model, format)
+    if dataset == "rooms":
+        room_cache.invalidate()
+    if dataset == "bookings":
+        await rebuild_occupancy()
+    if STATS_COUNTERS_ENABLED:
+        await rebuild_stats_counters()
+    event_broker.publish("dataset.imported", {"dataset": dataset, "inserted": summary["inserted"], "updated": summary["updated"]})
+    return summary
+
+@api_router.post("/admin/events/ticket")
+async def create_admin_events_ticket(admin: dict = Depends(get_current_admin)):
+    """A short-lived ticket for opening GET /admin/events from a browser."""
+    return {"ticket": create_event_ticket(admin['id']), "expires_in": EVENT_TICKET_TTL_SECONDS}
+
+@api_router.get("/admin/events")
+async def stream_admin_events(
+    request: Request,
+    ticket: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security),
+):
+    """Server-sent events for booking, room and contact changes.
+
+    EventSource cannot send an Authorization header, so browsers pass a
+    ``ticket`` from POST /admin/events/ticket instead. Tickets only open event
+    streams and expire within seconds, so one that ends up in an access log
+    is of no use. Reconnecting browsers send Last-Event-ID automatically and
+    resume where they left off; a client reconnecting with a fresh ticket can
+    pass it as ``last_event_id``.
+    """
+    if credentials:
+        await authenticate_token(credentials.credentials)
+    elif ticket:
+        await authenticate_token(ticket, audience=EVENT_TICKET_AUDIENCE)
+    else:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    
+    subscriber, backlog = event_broker.subscribe(last_event_id or request.query_params.get("last_event_id"))
+    return StreamingResponse(
+        sse_stream(request, subscriber, backlog),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@api_router.get("/admin/cache")
+async def get_cache_stats(admin: dict = Depends(get_current_admin)):
+    return {
+        "room_catalog": room_cache.stats(),
+        "admin_principals": admin_cache.stats(),
+        "events": event_broker.stats(),
+    }
+
+@api_router.get("/admin/outbox", dependencies=[Depends(require_mongo)])
+async def get_outbox_stats(admin: dict = Depends(get_current_admin)):
+    return await outbox_worker.stats()
+
+@api_router.get("/admin/rate-limits")
+async def get_rate_limit_stats(admin: dict = Depends(get_current_admin)):
+    return rate_limiter.stats()
+
 # ----- STATS -----
 
 @api_router.get("/stats")
 async def get_stats(admin: dict = Depends(get_current_admin)):
-    total_rooms = await db.rooms.count_documents({})
-    available_rooms = await db.rooms.count_documents({"availability_status": "available"})
-    total_bookings = await db.bookings.count_documents({})
-    pending_bookings = await db.bookings.count_documents({"status": "pending"})
-    confirmed_bookings = await db.bookings.count_documents({"status": "confirmed"})
-    total_messages = await db.contact_messages.count_documents({})
+    if STATS_COUNTERS_ENABLED:
+        counters = await db.stats_counters.find_one({"_id": STATS_COUNTERS_ID}, {"_id": 0})
+        if counters:
+            return counters
+        return await rebuild_stats_counters()
     
-    return {
-        "total_rooms": total_rooms,
-        "available_rooms": available_rooms,
-        "total_bookings": total_bookings,
-        "pending_bookings": pending_bookings,
-        "confirmed_bookings": confirmed_bookings,
-        "total_messages": total_messages
-    }
+    return await compute_stats()
 
 # ----- SEED DATA -----
 
 @api_router.post("/seed")
 async def seed_data():
     # Check if data already exists
-    existing_rooms = await db.rooms.count_documents({})
+    existing_rooms = await storage.rooms.count()
     if existing_rooms > 0:
         return {"message": "Data already seeded"}
     
@@ -429,7 +2649,7 @@ async def seed_data():
             "availability_status": "available",
             "total_slots": 1,
             "available_slots": 1,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -443,7 +2663,7 @@ async def seed_data():
             "availability_status": "almost_full",
             "total_slots": 1,
             "available_slots": 1,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -457,7 +2677,7 @@ async def seed_data():
             "availability_status": "available",
             "total_slots": 2,
             "available_slots": 2,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -471,7 +2691,7 @@ async def seed_data():
             "availability_status": "available",
             "total_slots": 2,
             "available_slots": 1,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         },
         {
             "id": str(uuid.uuid4()),
@@ -485,29 +2705,54 @@ async def seed_data():
             "availability_status": "fully_booked",
             "total_slots": 2,
             "available_slots": 0,
-            "created_at": datetime.now(timezone.utc).isoformat()
+            "created_at": datetime.now(timezone.utc)
         }
     ]
     
-    await db.rooms.insert_many(rooms)
+    await storage.rooms.insert_many(rooms)
+    room_cache.invalidate()
+    if STATS_COUNTERS_ENABLED:
+        await rebuild_stats_counters()
     
     # Create default admin
-    admin_exists = await db.admins.count_documents({})
+    admin_exists = await storage.admins.count()
     if admin_exists == 0:
         admin = AdminUser(
             email="admin@elantiq.com",
-            password_hash=hash_password("admin123"),
+            password_hash=await hash_password("admin123"),
             name="Admin"
         )
-        doc = admin.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        await db.admins.insert_one(doc)
-    
+        await storage.admins.insert(admin.model_dump())
+
     return {"message": "Data seeded successfully", "rooms_created": len(rooms)}
 
 # Include router
 app.include_router(api_router)
 
+# Served beside /api rather than under it so the public ingress does not expose it
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    extra = [
+        ("rate_limit_admitted_total", "Public write requests admitted by the rate limiter.", ("route",),
+         {(route,): count for route, count in rate_limiter.admitted.items()}),
+        ("rate_limit_shed_total", "Public write requests rejected with 429.", ("route",),
+         {(route,): count for route, count in rate_limiter.shed.items()}),
+    ]
+    return Response(content=metrics.render(extra), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=GZIP_LEVEL,
+        brotli_quality=BROTLI_QUALITY,
+        cache_entries=COMPRESSION_CACHE_ENTRIES,
+    )
+
+app.add_middleware(UploadSizeMiddleware, max_bytes=IMAGE_MAX_REQUEST_BYTES)
+
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -516,6 +2761,190 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def create_db_indexes():
+    if STORAGE_BACKEND != 'mongo':
+        logger.info(f"Using {STORAGE_BACKEND} storage; skipping MongoDB indexes")
+        return
+    await ensure_indexes()
+    # Recount on boot so counters never carry drift across restarts
+    if STATS_COUNTERS_ENABLED:
+        await rebuild_stats_counters()
+
+@app.on_event("startup")
+async def start_outbox_worker():
+    if STORAGE_BACKEND != 'mongo':
+        logger.warning("Email outbox needs MongoDB storage; notification emails are disabled")
+        return
+    outbox_worker.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await outbox_worker.stop()
+    if client is not None:
+        client.close()
+    password_hasher.shutdown()
+    image_processor.shutdown()
+
+# ===================== MIGRATIONS =====================
+
+TIMESTAMP_COLLECTIONS = ["rooms", "bookings", "contact_messages", "admins"]
+
+async def migrate_timestamps(batch_size: int = 500, pause_seconds: float = 0.05) -> dict:
+    """Rewrite ISO-string created_at values as BSON dates, a batch at a time.
+
+    Safe to run against a live app: each update only matches while the field
+    still holds the string it was read as, and the pause between batches keeps
+    write load low. Re-running it is a no-op once nothing is left to convert.
+    """
+    migrated = {}
+    for collection in TIMESTAMP_COLLECTIONS:
+        migrated[collection] = 0
+        while True:
+            docs = await db[collection].find(
+                {"created_at": {"$type": "string"}}, {"_id": 1, "created_at": 1}
+            ).limit(batch_size).to_list(batch_size)
+            if not docs:
+                break
+            updates = [
+                UpdateOne(
+                    {"_id": doc['_id'], "created_at": doc['created_at']},
+                    {"$set": {"created_at": datetime.fromisoformat(doc['created_at'])}},
+                )
+                for doc in docs
+            ]
+            result = await db[collection].bulk_write(updates, ordered=False)
+            migrated[collection] += result.modified_count
+            logger.info(f"Migrated {migrated[collection]} {collection} timestamps so far")
+            await asyncio.sleep(pause_seconds)
+    return migrated
+
+async def migrate_booking_dates(batch_size: int = 500, pause_seconds: float = 0.05) -> dict:
+    """Store move-in and move-out dates as BSON dates.
+
+    Free-form move-in strings that are not dates fall back to the day the
+    booking was made; the original text is kept in preferred_move_in_text.
+    Bookings without a move-out date get the default stay. Like
+    migrate_timestamps, each update only matches the values it was read as,
+    so this is safe on a live database. Occupancy is not touched: run
+    rebuild-occupancy afterwards, with the server stopped.
+    """
+    parse_date = TypeAdapter(date).validate_python
+    summary = {"converted": 0, "unparseable": 0, "move_out_defaulted": 0}
+    while True:
+        docs = await db.bookings.find(
+            {"$or": [{"preferred_move_in_date": {"$type": "string"}}, {"move_out_date": None}]},
+            {"_id": 1, "preferred_move_in_date": 1, "move_out_date": 1, "created_at": 1},
+        ).limit(batch_size).to_list(batch_size)
+        if not docs:
+            break
+        updates = []
+        for doc in docs:
+            move_in = doc.get('preferred_move_in_date')
+            changes = {}
+            if isinstance(move_in, str):
+                try:
+                    move_in = parse_date(move_in.strip())
+                    summary["converted"] += 1
+                except ValidationError:
+                    changes["preferred_move_in_text"] = move_in
+                    created_at = doc.get('created_at')
+                    move_in = created_at.date() if isinstance(created_at, datetime) else datetime.now(timezone.utc).date()
+                    summary["unparseable"] += 1
+                changes["preferred_move_in_date"] = as_datetime(move_in)
+            if doc.get('move_out_date') is None:
+                changes["move_out_date"] = as_datetime(add_months(move_in, DEFAULT_STAY_MONTHS))
+                summary["move_out_defaulted"] += 1
+            updates.append(UpdateOne(
+                {"_id": doc['_id'], "preferred_move_in_date": doc.get('preferred_move_in_date'), "move_out_date": doc.get('move_out_date')},
+                {"$set": changes},
+            ))
+        await db.bookings.bulk_write(updates, ordered=False)
+        logger.info(f"Migrated booking dates so far: {summary}")
+        await asyncio.sleep(pause_seconds)
+    return summary
+
+SEARCH_KEY_COLLECTIONS = {"bookings": BOOKING_PREFIX_FIELDS, "contact_messages": CONTACT_PREFIX_FIELDS}
+
+async def migrate_search_keys(batch_size: int = 500, pause_seconds: float = 0.05) -> dict:
+    """Store normalized email and phone search keys on records written before they existed.
+
+    Until it has run, older records are only found by text search. Like
+    migrate_timestamps, each update only matches the values it was read as.
+    """
+    migrated = {}
+    for collection, fields in SEARCH_KEY_COLLECTIONS.items():
+        migrated[collection] = 0
+        missing = {"$or": [{SEARCH_KEYS[field]: {"$exists": False}} for field in fields]}
+        while True:
+            docs = await db[collection].find(
+                missing, {"_id": 1, **{field: 1 for field in fields}}
+            ).limit(batch_size).to_list(batch_size)
+            if not docs:
+                break
+            updates = [
+                UpdateOne(
+                    {"_id": doc['_id'], **{field: doc.get(field) for field in fields}},
+                    {"$set": {SEARCH_KEYS[field]: search_key(field, doc.get(field)) for field in fields}},
+                )
+                for doc in docs
+            ]
+            result = await db[collection].bulk_write(updates, ordered=False)
+            migrated[collection] += result.modified_count
+            logger.info(f"Stored search keys on {migrated[collection]} {collection} so far")
+            await asyncio.sleep(pause_seconds)
+    return migrated
+
+# ===================== CLI =====================
+
+async def run_index_check() -> int:
+    await ensure_indexes(rebuild=True)
+    collscans = await check_query_plans()
+    for label in collscans:
+        logger.error(f"Query plan for {label} uses COLLSCAN")
+    if not collscans:
+        logger.info(f"All {len(QUERY_PLANS)} route queries are index-backed")
+    return 1 if collscans else 0
+
+def main():
+    parser = argparse.ArgumentParser(description="EL-ANTIQ Hostel API maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("check-indexes", help="Create or rebuild indexes and fail if any route query would COLLSCAN")
+    migrate = subparsers.add_parser("migrate-timestamps", help="Convert ISO-string created_at fields to BSON dates")
+    migrate.add_argument("--batch-size", type=int, default=500)
+    migrate.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches")
+    migrate_dates = subparsers.add_parser(
+        "migrate-booking-dates", help="Convert move-in dates to BSON dates; run rebuild-occupancy afterwards"
+    )
+    migrate_dates.add_argument("--batch-size", type=int, default=500)
+    migrate_dates.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches")
+    subparsers.add_parser("rebuild-occupancy", help="Recompute monthly room occupancy from bookings")
+    migrate_search = subparsers.add_parser(
+        "migrate-search-keys", help="Store normalized email and phone search keys on existing records"
+    )
+    migrate_search.add_argument("--batch-size", type=int, default=500)
+    migrate_search.add_argument("--pause", type=float, default=0.05, help="Seconds to sleep between batches")
+    args = parser.parse_args()
+
+    if args.command == "check-indexes":
+        return asyncio.run(run_index_check())
+    if args.command == "migrate-timestamps":
+        migrated = asyncio.run(migrate_timestamps(args.batch_size, args.pause))
+        logger.info(f"Timestamp migration complete: {migrated}")
+        return 0
+    if args.command == "migrate-booking-dates":
+        summary = asyncio.run(migrate_booking_dates(args.batch_size, args.pause))
+        logger.info(f"Booking date migration complete: {summary}")
+        logger.info("Stop the server and run rebuild-occupancy to count the migrated dates")
+        return 0
+    if args.command == "rebuild-occupancy":
+        counted = asyncio.run(rebuild_occupancy())
+        logger.info(f"Occupancy rebuilt from {counted} active bookings")
+        return 0
+    if args.command == "migrate-search-keys":
+        migrated = asyncio.run(migrate_search_keys(args.batch_size, args.pause))
+        logger.info(f"Search key migration complete: {migrated}")
+        return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,618 @@
+#!/usr/bin/env python3
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import requests
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+def import_server():
+    """Import backend/server.py; offline benchmarks get in-memory storage and no database connection"""
+    os.environ.setdefault('STORAGE_BACKEND', 'memory')
+    sys.path.insert(0, str(Path(__file__).parent / 'backend'))
+    import server
+    return server
+
+def serve(port):
+    """Run the API on 127.0.0.1:port"""
+    import logging
+    import uvicorn
+    server = import_server()
+    server.logger.setLevel(logging.WARNING)
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning")
+
+class LocalServer:
+    """Start the API in a child process so load generation does not share its GIL"""
+    def __init__(self, in_memory=False, mongo_url=None):
+        self.in_memory = in_memory
+        self.mongo_url = mongo_url
+        self.process = None
+
+    def __enter__(self):
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+        env = dict(os.environ)
+        if self.mongo_url:
+            env['MONGO_URL'] = self.mongo_url
+        env.setdefault('DB_NAME', 'hostel_benchmark')
+        env.setdefault('EMAIL_SENDER', 'stub')
+        env.setdefault('RATE_LIMIT_BACKEND', 'off')
+        env['STORAGE_BACKEND'] = 'memory' if self.in_memory else 'mongo'
+        command = [sys.executable, __file__, "--serve", str(port)]
+        self.process = subprocess.Popen(command, env=env)
+
+        base_url = f"http://127.0.0.1:{port}"
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("Local API server exited during startup")
+            try:
+                requests.get(f"{base_url}/api/", timeout=1)
+                return base_url
+            except requests.ConnectionError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError("Local API server did not start within 30s")
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def latency_rows(results, prefix=()):
+    """Yield (path, stats) for every latency summary nested in a results dict"""
+    for key, value in results.items():
+        if isinstance(value, dict) and "p95_ms" in value:
+            yield prefix + (key,), value
+        elif isinstance(value, dict):
+            yield from latency_rows(value, prefix + (key,))
+
+def booking_docs(n):
+    """n booking documents shaped like the ones the API stores"""
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": str(uuid.uuid4()),
+        "room_id": str(uuid.uuid4()),
+        "room_name": "Shared Room A",
+        "room_type": "2-in-1",
+        "full_name": f"Student {i}",
+        "phone_number": "0551234567",
+        "email": f"student{i}@example.com",
+        "school": "University of Ghana",
+        "preferred_move_in_date": "2024-09-01",
+        "status": "pending",
+        "created_at": now,
+    } for i in range(n)]
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of latencies"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def summarize(latencies):
+    return {
+        "count": len(latencies),
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+    }
+
+class HostelAPIBenchmark:
+    def __init__(self, base_url="http://localhost:8001"):
+        self.base_url = base_url
+        self.api_url = f"{base_url}/api"
+        self.results = {}
+        self._local = threading.local()
+
+    @property
+    def session(self):
+        """One keep-alive session per thread; requests.Session is not thread-safe"""
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def timed_get(self, path):
+        """Time one GET request, returning its latency in seconds"""
+        start = time.perf_counter()
+        response = self.session.get(f"{self.api_url}{path}", timeout=30)
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        return elapsed
+
+    def sample_public_latency(self, path, duration, concurrency=4):
+        """Hit a public endpoint from several threads for `duration` seconds"""
+        deadline = time.perf_counter() + duration
+
+        def worker(_):
+            latencies = []
+            while time.perf_counter() < deadline:
+                latencies.append(self.timed_get(path))
+            return latencies
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            return [lat for batch in pool.map(worker, range(concurrency)) for lat in batch]
+
+    def login(self, _):
+        response = requests.post(
+            f"{self.api_url}/admin/login",
+            json={"email": "admin@elantiq.com", "password": "admin123"},
+            timeout=60
+        )
+        return response.status_code
+
+    def bench_login_burst(self, logins=50, duration=5.0):
+        """Compare public /rooms latency at rest and during a burst of admin logins"""
+        self.session.post(f"{self.api_url}/seed", timeout=15)
+
+        baseline = summarize(self.sample_public_latency("/rooms", duration))
+
+        with ThreadPoolExecutor(max_workers=logins) as pool:
+            burst = [pool.submit(self.login, i) for i in range(logins)]
+            under_load = summarize(self.sample_public_latency("/rooms", duration))
+            codes = [f.result() for f in burst]
+
+        self.results["login_burst"] = {
+            "baseline": baseline,
+            "during_burst": under_load,
+            "logins": {str(code): codes.count(code) for code in sorted(set(codes))},
+        }
+        return self.results["login_burst"]
+
+    def admin_headers(self):
+        response = self.session.post(
+            f"{self.api_url}/admin/login",
+            json={"email": "admin@elantiq.com", "password": "admin123"},
+            timeout=60
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def bench_search(self, bookings=100000, repeat=50):
+        """Search latency over /bookings once the collection holds `bookings` documents.
+
+        Bookings are streamed in through the NDJSON import endpoint, so run this
+        against a throwaway database.
+        """
+        self.session.post(f"{self.api_url}/seed", timeout=15)
+        headers = self.admin_headers()
+        now = datetime.now(timezone.utc).isoformat()
+        schools = ["University of Ghana", "KNUST", "UCC", "Ashesi University", "GIMPA"]
+
+        def rows():
+            for i in range(bookings):
+                yield (json.dumps({
+                    "id": str(uuid.uuid4()),
+                    "room_id": "benchmark",
+                    "room_name": "Benchmark Room",
+                    "room_type": "2-in-1",
+                    "full_name": f"Student{i} Mensah{i % 997}",
+                    "phone_number": f"05{i:08d}",
+                    "email": f"student{i}@example.com",
+                    "school": schools[i % len(schools)],
+                    "preferred_move_in_date": "2024-09-01",
+                    "status": "pending",
+                    "created_at": now,
+                }) + "\n").encode("utf-8")
+
+        start = time.perf_counter()
+        response = self.session.post(
+            f"{self.api_url}/admin/import/bookings",
+            params={"format": "ndjson"},
+            data=rows(),
+            headers={**headers, "Content-Type": "application/x-ndjson"},
+            timeout=3600
+        )
+        response.raise_for_status()
+        seeded = time.perf_counter() - start
+
+        terms = {
+            "text_name": f"Mensah{bookings % 997}",
+            "text_school": "Ashesi",
+            "email_prefix": f"student{bookings // 2}@",
+            "phone_prefix": f"05{bookings // 2:08d}"[:7],
+        }
+        self.results["search"] = {"seed": {"bookings": bookings, "seconds": round(seeded, 1)}}
+        for name, term in terms.items():
+            latencies = []
+            for _ in range(repeat):
+                begin = time.perf_counter()
+                response = self.session.get(
+                    f"{self.api_url}/bookings",
+                    params={"search": term, "limit": 50},
+                    headers=headers,
+                    timeout=30
+                )
+                latencies.append(time.perf_counter() - begin)
+                response.raise_for_status()
+            self.results["search"][name] = summarize(latencies)
+        return self.results["search"]
+
+    def bench_availability(self, rooms=2000, bookings=200000, repeat=50):
+        """Date-range availability latency over `rooms` rooms holding `bookings` stays.
+
+        Rooms and bookings are streamed in through the NDJSON import endpoint,
+        which also rebuilds monthly occupancy, so run this against a throwaway
+        database.
+        """
+        self.session.post(f"{self.api_url}/seed", timeout=15)
+        headers = {**self.admin_headers(), "Content-Type": "application/x-ndjson"}
+        rng = random.Random(22)
+        now = datetime.now(timezone.utc).isoformat()
+        room_types = {"1-in-1": 1, "2-in-1": 2, "4-in-1": 4}
+        room_rows = [{
+            "id": f"availability-room-{i}",
+            "name": f"Availability Room {i}",
+            "room_type": room_type,
+            "price": 2000 + 500 * slots,
+            "description": "Benchmark room.",
+            "amenities": [],
+            "images": [],
+            "total_slots": slots * 4,
+            "available_slots": slots * 4,
+        } for i, (room_type, slots) in ((i, rng.choice(list(room_types.items()))) for i in range(rooms))]
+
+        def booking_rows():
+            for i in range(bookings):
+                room = room_rows[rng.randrange(rooms)]
+                move_in = date(2026, 1, 1) + timedelta(days=rng.randrange(540))
+                yield (json.dumps({
+                    "id": f"availability-booking-{i}",
+                    "room_id": room["id"],
+                    "room_name": room["name"],
+                    "room_type": room["room_type"],
+                    "full_name": f"Student {i}",
+                    "phone_number": f"05{i:08d}",
+                    "email": f"stay{i}@example.com",
+                    "school": "University of Ghana",
+                    "preferred_move_in_date": move_in.isoformat(),
+                    "move_out_date": (move_in + timedelta(days=rng.randrange(30, 300))).isoformat(),
+                    "status": rng.choice(["pending", "confirmed", "confirmed", "cancelled"]),
+                    "created_at": now,
+                }) + "\n").encode("utf-8")
+
+        start = time.perf_counter()
+        for dataset, body in (
+            ("rooms", "".join(json.dumps(row) + "\n" for row in room_rows).encode("utf-8")),
+            ("bookings", booking_rows()),
+        ):
+            response = self.session.post(
+                f"{self.api_url}/admin/import/{dataset}",
+                params={"format": "ndjson"},
+                data=body,
+                headers=headers,
+                timeout=3600
+            )
+            response.raise_for_status()
+        seeded = time.perf_counter() - start
+
+        ranges = {
+            "month": {"from": "2026-10-01", "to": "2026-11-01"},
+            "semester": {"from": "2026-09-01", "to": "2027-01-01"},
+            "academic_year": {"from": "2026-09-01", "to": "2027-06-01"},
+            "semester_4_in_1": {"from": "2026-09-01", "to": "2027-01-01", "room_type": "4-in-1"},
+        }
+        self.results["availability"] = {"seed": {"rooms": rooms, "bookings": bookings, "seconds": round(seeded, 1)}}
+        for name, params in ranges.items():
+            latencies = []
+            for _ in range(repeat):
+                begin = time.perf_counter()
+                response = self.session.get(f"{self.api_url}/rooms/available", params=params, timeout=30)
+                latencies.append(time.perf_counter() - begin)
+                response.raise_for_status()
+            self.results["availability"][name] = {**summarize(latencies), "rooms": len(response.json())}
+        return self.results["availability"]
+
+    def load_fixtures(self):
+        """Seed data, log in and add a room with enough slots for any booking burst"""
+        self.session.post(f"{self.api_url}/seed", timeout=15).raise_for_status()
+        headers = self.admin_headers()
+        room = self.session.post(f"{self.api_url}/rooms", json={
+            "name": "Load Test Room",
+            "room_type": "4-in-1",
+            "price": 4000,
+            "description": "Unlimited room for booking bursts.",
+            "amenities": [],
+            "images": [],
+            "total_slots": 10 ** 9,
+            "available_slots": 10 ** 9,
+        }, headers=headers, timeout=10)
+        room.raise_for_status()
+        rooms = self.session.get(f"{self.api_url}/rooms", timeout=10).json()
+        return {"headers": headers, "rooms": rooms, "burst_room": room.json()}
+
+    def browse_request(self, rng, fixtures, state):
+        roll = rng.random()
+        if roll < 0.5:
+            return "GET /rooms", "GET", "/rooms", {}
+        if roll < 0.7:
+            room_type = rng.choice(fixtures["rooms"])["room_type"]
+            return "GET /rooms?room_type", "GET", "/rooms", {"params": {"room_type": room_type}}
+        room_id = rng.choice(fixtures["rooms"])["id"]
+        return "GET /rooms/{id}", "GET", f"/rooms/{room_id}", {}
+
+    def booking_request(self, rng, fixtures, state):
+        room = fixtures["burst_room"]
+        n = rng.randrange(10 ** 6)
+        return "POST /bookings", "POST", "/bookings", {"json": {
+            "room_id": room["id"],
+            "room_name": room["name"],
+            "room_type": room["room_type"],
+            "full_name": f"Load Student {n}",
+            "phone_number": f"055{n:07d}",
+            "email": f"load{n}@student.com",
+            "school": "University of Ghana",
+            "preferred_move_in_date": "2024-09-01",
+        }}
+
+    def dashboard_request(self, rng, fixtures, state):
+        headers = fixtures["headers"]
+        roll = rng.random()
+        if roll < 0.2 or "since" not in state:
+            return "GET /admin/dashboard", "GET", "/admin/dashboard", {"headers": headers}
+        if roll < 0.8:
+            params = {"since": state["since"], "rooms_etag": state["rooms_etag"]}
+            return "GET /admin/dashboard?since", "GET", "/admin/dashboard", {"headers": headers, "params": params}
+        if roll < 0.9:
+            return "GET /stats", "GET", "/stats", {"headers": headers}
+        return "GET /bookings?limit", "GET", "/bookings", {"headers": headers, "params": {"limit": 50}}
+
+    def run_mix(self, make_request, fixtures, duration, concurrency):
+        """Drive `concurrency` closed-loop clients for `duration` seconds; per-endpoint stats"""
+        deadline = time.perf_counter() + duration
+
+        def worker(seed):
+            rng = random.Random(seed)
+            state = {}
+            samples = {}
+            while time.perf_counter() < deadline:
+                label, method, path, kwargs = make_request(rng, fixtures, state)
+                start = time.perf_counter()
+                response = self.session.request(method, f"{self.api_url}{path}", timeout=30, **kwargs)
+                elapsed = time.perf_counter() - start
+                latencies, errors = samples.setdefault(label, ([], [0]))
+                latencies.append(elapsed)
+                if response.status_code >= 400:
+                    errors[0] += 1
+                elif label.startswith("GET /admin/dashboard"):
+                    body = response.json()
+                    state["since"] = body["server_time"]
+                    state["rooms_etag"] = body["rooms_etag"]
+            return samples
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            batches = list(pool.map(worker, range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+        report = {}
+        for label in sorted({label for batch in batches for label in batch}):
+            latencies = [lat for batch in batches for lat in batch.get(label, ([], [0]))[0]]
+            errors = sum(batch.get(label, ([], [0]))[1][0] for batch in batches)
+            report[label] = {**summarize(latencies), "errors": errors, "rps": len(latencies) / elapsed}
+        return report
+
+    def bench_load(self, duration=10.0, concurrency=16):
+        """Concurrent catalog browsing, booking bursts and dashboard refreshes"""
+        fixtures = self.load_fixtures()
+        mixes = {
+            "browse": self.browse_request,
+            "booking-burst": self.booking_request,
+            "dashboard": self.dashboard_request,
+        }
+        self.results["load"] = {
+            name: self.run_mix(make_request, fixtures, duration, concurrency)
+            for name, make_request in mixes.items()
+        }
+        return self.results["load"]
+
+    def bench_serialization(self, sizes=(100, 1000, 10000), repeat=5):
+        """Compare list serialization paths for booking documents, offline"""
+        from fastapi.responses import JSONResponse
+        from fastapi.routing import serialize_response
+        from fastapi.utils import create_response_field
+        server = import_server()
+
+        field = create_response_field(name="bookings", type_=server.List[server.Booking])
+        adapter = server.list_adapter(server.Booking)
+
+        async def fastapi_default(docs):
+            content = await serialize_response(field=field, response_content=docs)
+            return JSONResponse(content).body
+
+        async def batched_adapter(docs):
+            return adapter.dump_json(adapter.validate_python(docs))
+
+        async def trusted_dump(docs):
+            return server.dump_trusted(docs, adapter)
+
+        paths = {"fastapi_default": fastapi_default, "batched_adapter": batched_adapter}
+        if server.orjson is not None:
+            paths["orjson_trusted"] = trusted_dump
+
+        async def run():
+            results = {}
+            for n in sizes:
+                docs = booking_docs(n)
+                row = {}
+                for name, dump in paths.items():
+                    best = min([await self._time_async(dump, docs) for _ in range(repeat)])
+                    row[name] = {"ms": best * 1000, "docs_per_s": n / best}
+                results[str(n)] = row
+            return results
+
+        self.results["serialization"] = asyncio.run(run())
+        return self.results["serialization"]
+
+    def bench_compression(self, sizes=(10, 100, 1000), repeat=5):
+        """Compare response compression settings on booking list bodies, offline"""
+        server = import_server()
+        adapter = server.list_adapter(server.Booking)
+        settings = {f"gzip-{level}": ("gzip", level) for level in (1, 6, 9)}
+        if server.brotli is not None:
+            settings.update({f"br-{quality}": ("br", quality) for quality in (1, 5, 11)})
+
+        def compress(encoding, level, body):
+            compressor = server.Compressor(encoding, level, level)
+            return compressor.compress(body) + compressor.finish()
+
+        results = {}
+        for n in sizes:
+            body = adapter.dump_json(adapter.validate_python(booking_docs(n)))
+            row = {"identity": {"bytes": len(body), "ratio": 1.0, "ms": 0.0}}
+            for name, (encoding, level) in settings.items():
+                timings = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    data = compress(encoding, level, body)
+                    timings.append(time.perf_counter() - start)
+                row[name] = {"bytes": len(data), "ratio": len(body) / len(data), "ms": min(timings) * 1000}
+            results[str(n)] = row
+
+        self.results["compression"] = results
+        return results
+
+    def save_results(self, path):
+        """Write results with the commit they were measured at; returns the path"""
+        commit = git_commit()
+        path = Path(path or Path(__file__).parent / "benchmark_results" / f"{commit}.json")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "commit": commit,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "base_url": self.base_url,
+            "results": self.results,
+        }, indent=2))
+        return path
+
+    def compare_results(self, baseline_path):
+        """Print p95 and throughput changes against a saved results file"""
+        baseline = json.loads(Path(baseline_path).read_text())
+        before = dict(latency_rows(baseline["results"]))
+        print(f"\n📈 Compared with {baseline['commit']} ({baseline['created_at']})")
+        for key, stats in latency_rows(self.results):
+            old = before.get(key)
+            if not old or not old["p95_ms"]:
+                continue
+            line = (
+                f"  {' / '.join(key):<48} p95 {old['p95_ms']:8.1f} -> {stats['p95_ms']:8.1f}ms "
+                f"({(stats['p95_ms'] / old['p95_ms'] - 1) * 100:+.0f}%)"
+            )
+            if "rps" in stats and old.get("rps"):
+                line += f"  rps {old['rps']:.1f} -> {stats['rps']:.1f} ({(stats['rps'] / old['rps'] - 1) * 100:+.0f}%)"
+            print(line)
+
+    @staticmethod
+    async def _time_async(fn, *args):
+        start = time.perf_counter()
+        await fn(*args)
+        return time.perf_counter() - start
+
+    def print_results(self):
+        for name, result in self.results.items():
+            print(f"\n📊 {name}")
+            for phase, stats in result.items():
+                if name == "load":
+                    print(f"  {phase}")
+                    for endpoint, row in stats.items():
+                        print(
+                            f"    {endpoint:<28} n={row['count']:<6} {row['rps']:7.1f} req/s "
+                            f"p50={row['p50_ms']:.1f}ms p95={row['p95_ms']:.1f}ms p99={row['p99_ms']:.1f}ms "
+                            f"errors={row['errors']}"
+                        )
+                elif name == "serialization":
+                    print(f"  {phase} docs")
+                    for path, timing in stats.items():
+                        print(f"    {path:<16} {timing['ms']:8.2f}ms  {timing['docs_per_s']:12,.0f} docs/s")
+                elif name == "compression":
+                    print(f"  {phase} docs")
+                    for setting, size in stats.items():
+                        print(f"    {setting:<10} {size['bytes']:10,} bytes  x{size['ratio']:5.1f}  {size['ms']:8.2f}ms")
+                elif "p99_ms" in stats:
+                    print(
+                        f"  {phase:<14} n={stats['count']:<6} p50={stats['p50_ms']:.1f}ms "
+                        f"p95={stats['p95_ms']:.1f}ms p99={stats['p99_ms']:.1f}ms"
+                    )
+                else:
+                    print(f"  {phase:<14} {stats}")
+
+SCENARIOS = {
+    "login-burst": HostelAPIBenchmark.bench_login_burst,
+    "serialization": HostelAPIBenchmark.bench_serialization,
+    "search": HostelAPIBenchmark.bench_search,
+    "load": HostelAPIBenchmark.bench_load,
+    "availability": HostelAPIBenchmark.bench_availability,
+    "compression": HostelAPIBenchmark.bench_compression,
+}
+
+# Scenarios that import hundreds of thousands of bookings into the target
+# database; they only run by default against --in-memory storage
+BULK_SCENARIOS = ("search", "availability")
+
+def main():
+    parser = argparse.ArgumentParser(description="EL-ANTIQ Hostel API benchmarks")
+    parser.add_argument("scenarios", nargs="*", metavar="SCENARIO", help=f"one of: {', '.join(SCENARIOS)} (default: all; {', '.join(BULK_SCENARIOS)} only with --in-memory)")
+    parser.add_argument("--base-url", default="http://localhost:8001")
+    parser.add_argument("--local", action="store_true", help="start the API locally instead of using --base-url")
+    parser.add_argument("--mongo-url", help="MongoDB for --local (default: $MONGO_URL)")
+    parser.add_argument("--in-memory", action="store_true", help="start the API locally with in-memory storage instead of MongoDB")
+    parser.add_argument("--save", nargs="?", const="", metavar="PATH", help="save results (default: benchmark_results/<commit>.json)")
+    parser.add_argument("--compare", metavar="PATH", help="compare results with a saved run")
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return 0
+    for scenario in args.scenarios:
+        if scenario not in SCENARIOS:
+            parser.error(f"unknown scenario: {scenario}")
+    if not args.scenarios:
+        args.scenarios = [name for name in SCENARIOS if args.in_memory or name not in BULK_SCENARIOS]
+        if not args.in_memory:
+            print(f"Skipping {', '.join(BULK_SCENARIOS)}: they bulk-import bookings, so name them explicitly "
+                  f"or use --in-memory")
+
+    print("🚀 Starting EL-ANTIQ Hostel API Benchmarks")
+    print("=" * 50)
+    if args.local or args.in_memory:
+        with LocalServer(args.in_memory, args.mongo_url) as base_url:
+            bench = HostelAPIBenchmark(base_url)
+            for scenario in args.scenarios:
+                SCENARIOS[scenario](bench)
+    else:
+        bench = HostelAPIBenchmark(args.base_url)
+        for scenario in args.scenarios:
+            SCENARIOS[scenario](bench)
+    bench.print_results()
+    if args.save is not None:
+        print(f"\n💾 Results saved to {bench.save_results(args.save)}")
+    if args.compare:
+        bench.compare_results(args.compare)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,8 +3,15 @@
 import requests
 import sys
 import json
+import base64
+import uuid
 from datetime import datetime
 
+# A 1x1 PNG, enough to exercise the upload pipeline
+TINY_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+)
+
 class HostelAPITester:
     def __init__(self, base_url="https://hostel-booking-4.preview.emergentagent.com"):
         self.base_url = base_url
@@ -105,6 +112,134 @@ class HostelAPITester:
             self.log_test("Room Filtering", False, f"Error: {str(e)}")
             return False
 
+    def test_room_query_options(self):
+        """Test price range, sort, fields and ids on the room list"""
+        try:
+            response = requests.get(
+                f"{self.api_url}/rooms", params={"sort": "price", "min_price": 4000, "max_price": 5000}, timeout=10
+            )
+            success1 = response.status_code == 200
+            prices = [room["price"] for room in response.json()] if success1 else []
+            success1 = success1 and prices == sorted(prices) and all(4000 <= price <= 5000 for price in prices)
+
+            response = requests.get(f"{self.api_url}/rooms", params={"fields": "name,price"}, timeout=10)
+            success2 = response.status_code == 200
+            cards = response.json() if success2 else []
+            success2 = success2 and all(set(card) == {"id", "name", "price"} for card in cards)
+
+            wanted = [card["id"] for card in cards[:2]]
+            response = requests.get(f"{self.api_url}/rooms", params={"ids": ",".join(wanted)}, timeout=10)
+            success3 = response.status_code == 200 and sorted(room["id"] for room in response.json()) == sorted(wanted)
+
+            # Unknown sorts and fields are rejected
+            response = requests.get(f"{self.api_url}/rooms", params={"sort": "password"}, timeout=10)
+            success4 = response.status_code == 400
+            response = requests.get(f"{self.api_url}/rooms", params={"fields": "name,secret"}, timeout=10)
+            success4 = success4 and response.status_code == 400
+
+            success = success1 and success2 and success3 and success4
+            details = f"Price sorted: {success1}, Fields: {success2}, Ids: {success3}, Validation: {success4}"
+
+            self.log_test("Room Query Options", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Room Query Options", False, f"Error: {str(e)}")
+            return False
+
+    def test_response_compression(self):
+        """Test gzip negotiation on the room list"""
+        try:
+            response = requests.get(f"{self.api_url}/rooms", headers={"Accept-Encoding": "gzip"}, timeout=10)
+            success1 = response.status_code == 200 and response.headers.get("Content-Encoding") == "gzip"
+            success1 = success1 and "Accept-Encoding" in response.headers.get("Vary", "")
+            compressed_rooms = response.json() if success1 else []
+
+            response = requests.get(f"{self.api_url}/rooms", headers={"Accept-Encoding": "identity"}, timeout=10)
+            success2 = response.status_code == 200 and "Content-Encoding" not in response.headers
+            success2 = success2 and response.json() == compressed_rooms
+
+            # Tiny payloads are not worth compressing
+            response = requests.get(f"{self.api_url}/", headers={"Accept-Encoding": "gzip"}, timeout=10)
+            success3 = response.status_code == 200 and "Content-Encoding" not in response.headers
+
+            success = success1 and success2 and success3
+            details = f"Gzip: {success1}, Identity: {success2}, Small body skipped: {success3}"
+
+            self.log_test("Response Compression", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Response Compression", False, f"Error: {str(e)}")
+            return False
+
+    def test_room_image_upload(self, room_id):
+        """Test uploading a room image and fetching its variants"""
+        if not self.admin_token:
+            self.log_test("Room Image Upload", False, "No admin token available")
+            return False
+
+        try:
+            headers = {"Authorization": f"Bearer {self.admin_token}"}
+            response = requests.post(
+                f"{self.api_url}/rooms/{room_id}/images",
+                files=[("files", ("tiny.png", TINY_PNG, "image/png"))],
+                headers=headers,
+                timeout=30
+            )
+            success1 = response.status_code == 200
+            image_url = response.json()["images"][-1] if success1 else ""
+            success1 = success1 and image_url.startswith("/api/images/") and image_url.endswith("-full.webp")
+
+            success2 = success1
+            for variant in ("thumb", "card", "full"):
+                response = requests.get(f"{self.base_url}{image_url.replace('-full.', f'-{variant}.')}", timeout=10)
+                success2 = success2 and response.status_code == 200
+                success2 = success2 and "immutable" in response.headers.get("Cache-Control", "")
+
+            # Anything Pillow cannot decode is rejected
+            response = requests.post(
+                f"{self.api_url}/rooms/{room_id}/images",
+                files=[("files", ("fake.png", b"not an image", "image/png"))],
+                headers=headers,
+                timeout=30
+            )
+            success3 = response.status_code == 400
+
+            success = success1 and success2 and success3
+            details = f"Uploaded: {success1}, Variants: {success2}, Invalid rejected: {success3}"
+
+            self.log_test("Room Image Upload", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Room Image Upload", False, f"Error: {str(e)}")
+            return False
+
+    def test_available_rooms(self):
+        """Test date-range availability"""
+        try:
+            response = requests.get(
+                f"{self.api_url}/rooms/available",
+                params={"from": "2026-09-01", "to": "2027-06-01", "room_type": "2-in-1"},
+                timeout=10
+            )
+            success1 = response.status_code == 200
+            rooms = response.json() if success1 else []
+            success1 = success1 and all(room["room_type"] == "2-in-1" and room["free_beds"] >= 1 for room in rooms)
+
+            # Ranges must run forwards
+            response = requests.get(
+                f"{self.api_url}/rooms/available", params={"from": "2026-09-01", "to": "2026-08-01"}, timeout=10
+            )
+            success2 = response.status_code == 400
+
+            success = success1 and success2
+            details = f"2-in-1 rooms free Sep-May: {len(rooms)}, reversed range: {response.status_code}"
+
+            self.log_test("Available Rooms By Date", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Available Rooms By Date", False, f"Error: {str(e)}")
+            return False
+
     def test_get_room_details(self, room_id):
         """Test getting specific room details"""
         try:
@@ -349,6 +484,67 @@ class HostelAPITester:
             self.log_test("Update Room Availability", False, f"Error: {str(e)}")
             return False
 
+    def test_contact_idempotency(self):
+        """Test that a retried contact message with the same Idempotency-Key is replayed"""
+        try:
+            message_data = {
+                "name": "Retry Sender",
+                "email": "retry@test.com",
+                "message": "Idempotency test message."
+            }
+            headers = {"Idempotency-Key": str(uuid.uuid4())}
+            
+            first = requests.post(f"{self.api_url}/contact", json=message_data, headers=headers, timeout=10)
+            retry = requests.post(f"{self.api_url}/contact", json=message_data, headers=headers, timeout=10)
+            success = (
+                first.status_code == 200
+                and retry.status_code == 200
+                and retry.headers.get('Idempotent-Replayed') == "true"
+                and retry.json().get('id') == first.json().get('id')
+            )
+            
+            details = f"Status: {first.status_code}/{retry.status_code}, replayed: {retry.headers.get('Idempotent-Replayed')}"
+            self.log_test("Contact Idempotency", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Contact Idempotency", False, f"Error: {str(e)}")
+            return False
+
+    def test_contact_rate_limit(self, attempts=20):
+        """Test that a burst of contact messages is cut off with 429 and Retry-After,
+        while a retry of an already answered Idempotency-Key is still replayed"""
+        try:
+            message_data = {
+                "name": "Burst Sender",
+                "email": "burst@test.com",
+                "message": "Rate limit test message."
+            }
+            retry_headers = {"Idempotency-Key": str(uuid.uuid4())}
+            requests.post(f"{self.api_url}/contact", json=message_data, headers=retry_headers, timeout=10)
+            
+            responses = [
+                requests.post(f"{self.api_url}/contact", json=message_data, timeout=10)
+                for _ in range(attempts)
+            ]
+            limited = [r for r in responses if r.status_code == 429]
+            retry = requests.post(f"{self.api_url}/contact", json=message_data, headers=retry_headers, timeout=10)
+            success = (
+                bool(limited)
+                and limited[0].headers.get('Retry-After', '').isdigit()
+                and retry.status_code == 200
+                and retry.headers.get('Idempotent-Replayed') == "true"
+            )
+            
+            details = f"{attempts} messages: {len(limited)} rate limited"
+            if limited:
+                details += f", Retry-After: {limited[0].headers.get('Retry-After')}s"
+            details += f", retry after burst: {retry.status_code}"
+            self.log_test("Contact Rate Limit", success, details)
+            return success
+        except Exception as e:
+            self.log_test("Contact Rate Limit", False, f"Error: {str(e)}")
+            return False
+
     def run_all_tests(self):
         """Run comprehensive API tests"""
         print("🚀 Starting EL-ANTIQ Hostel API Tests")
@@ -367,6 +563,9 @@ class HostelAPITester:
         if rooms_success and rooms:
             # Test room filtering
             self.test_room_filters()
+            self.test_room_query_options()
+            self.test_response_compression()
+            self.test_available_rooms()
             
             # Test room details with first room
             first_room = rooms[0]
@@ -392,10 +591,16 @@ class HostelAPITester:
                 
                 # Room management tests
                 self.test_update_room_availability(first_room['id'])
+                self.test_room_image_upload(first_room['id'])
                 
                 # Contact message tests
                 self.test_contact_message()
                 self.test_get_contact_messages()
+                
+                self.test_contact_idempotency()
+                
+                # Public write rate limiting
+                self.test_contact_rate_limit()
         
         # Print summary
         print("\n" + "=" * 50)
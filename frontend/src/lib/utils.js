@@ -4,3 +4,14 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs) {
   return twMerge(clsx(inputs));
 }
+
+// Uploaded room images are stored as the URL of their "full" variant; the
+// thumb and card variants share the name apart from the variant. External
+// URLs are returned unchanged.
+const UPLOADED_IMAGE = /^\/api\/images\/([0-9a-f]+)-full\.(\w+)$/;
+
+export function roomImage(url, variant = "full") {
+  const match = UPLOADED_IMAGE.exec(url || "");
+  if (!match) return url;
+  return `${process.env.REACT_APP_BACKEND_URL}/api/images/${match[1]}-${variant}.${match[2]}`;
+}
@@ -1,5 +1,5 @@
 /* eslint-disable react-hooks/exhaustive-deps */
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useNavigate, Link } from "react-router-dom";
 import axios from "axios";
 import { Button } from "@/components/ui/button";
@@ -42,12 +42,35 @@ import {
   Loader2,
   CheckCircle,
   XCircle,
-  Clock
+  Clock,
+  ImagePlus
 } from "lucide-react";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Apply a delta from the dashboard endpoint: replace changed items in place and
+// put new ones (newest first) at the top.
+const mergeById = (current, changed) => {
+  const byId = new Map(changed.map((item) => [item.id, item]));
+  const existing = new Set(current.map((item) => item.id));
+  return [
+    ...changed.filter((item) => !existing.has(item.id)),
+    ...current.map((item) => byId.get(item.id) || item),
+  ];
+};
+
+// Server-sent events that should trigger an incremental dashboard refresh
+const LIVE_EVENTS = [
+  "booking.created",
+  "booking.status_changed",
+  "room.created",
+  "room.updated",
+  "room.deleted",
+  "contact.received",
+  "dataset.imported",
+];
+
 const AdminDashboard = () => {
   const navigate = useNavigate();
   const [loading, setLoading] = useState(true);
@@ -58,6 +81,7 @@ const AdminDashboard = () => {
   const [messages, setMessages] = useState([]);
   const [roomDialogOpen, setRoomDialogOpen] = useState(false);
   const [editingRoom, setEditingRoom] = useState(null);
+  const syncRef = useRef({ since: null, roomsEtag: null });
 
   const getAuthHeaders = () => {
     const token = localStorage.getItem("adminToken");
@@ -73,22 +97,81 @@ const AdminDashboard = () => {
     fetchData();
   }, [navigate]);
 
+  useEffect(() => {
+    const token = localStorage.getItem("adminToken");
+    if (!token) return;
+
+    let source = null;
+    let closed = false;
+    let lastEventId = null;
+    let refreshTimer = null;
+    let reconnectTimer = null;
+    // Coalesce bursts of events into one delta fetch
+    const scheduleRefresh = () => {
+      clearTimeout(refreshTimer);
+      refreshTimer = setTimeout(fetchData, 300);
+    };
+    const onEvent = (event) => {
+      lastEventId = event.lastEventId || lastEventId;
+      scheduleRefresh();
+    };
+
+    // EventSource cannot send the bearer token, so each connection opens
+    // with a short-lived ticket instead of putting the token in the URL
+    const connect = async () => {
+      try {
+        const { data } = await axios.post(`${API}/admin/events/ticket`, {}, {
+          headers: getAuthHeaders(),
+        });
+        if (closed) return;
+        const params = new URLSearchParams({ ticket: data.ticket });
+        if (lastEventId) params.set("last_event_id", lastEventId);
+        source = new EventSource(`${API}/admin/events?${params}`);
+      } catch {
+        if (!closed) reconnectTimer = setTimeout(connect, 5000);
+        return;
+      }
+      LIVE_EVENTS.forEach((type) => source.addEventListener(type, onEvent));
+      // The server could not resume our stream; fall back to a full reload
+      source.addEventListener("reset", () => {
+        syncRef.current = { since: null, roomsEtag: null };
+        scheduleRefresh();
+      });
+      // The browser gives up once a reconnect is refused, e.g. with an expired ticket
+      source.onerror = () => {
+        if (source.readyState === EventSource.CLOSED && !closed) {
+          reconnectTimer = setTimeout(connect, 3000);
+        }
+      };
+    };
+    connect();
+
+    return () => {
+      closed = true;
+      clearTimeout(refreshTimer);
+      clearTimeout(reconnectTimer);
+      if (source) source.close();
+    };
+  }, []);
+
   const fetchData = async () => {
+    const { since, roomsEtag } = syncRef.current;
     try {
-      setLoading(true);
-      const headers = getAuthHeaders();
+      if (!since) setLoading(true);
+      const params = {};
+      if (since) params.since = since;
+      if (roomsEtag) params.rooms_etag = roomsEtag;
       
-      const [statsRes, roomsRes, bookingsRes, messagesRes] = await Promise.all([
-        axios.get(`${API}/stats`, { headers }),
-        axios.get(`${API}/rooms`),
-        axios.get(`${API}/bookings`, { headers }),
-        axios.get(`${API}/contact`, { headers }),
-      ]);
+      const { data } = await axios.get(`${API}/admin/dashboard`, {
+        headers: getAuthHeaders(),
+        params,
+      });
       
-      setStats(statsRes.data);
-      setRooms(roomsRes.data);
-      setBookings(bookingsRes.data);
-      setMessages(messagesRes.data);
+      setStats(data.stats);
+      if (data.rooms) setRooms(data.rooms);
+      setBookings((current) => (since ? mergeById(current, data.bookings) : data.bookings));
+      setMessages((current) => (since ? mergeById(current, data.messages) : data.messages));
+      syncRef.current = { since: data.server_time, roomsEtag: data.rooms_etag };
     } catch (error) {
       console.error("Error fetching data:", error);
       if (error.response?.status === 401) {
@@ -134,6 +217,20 @@ const AdminDashboard = () => {
     }
   };
 
+  const uploadRoomImages = async (roomId, files) => {
+    if (!files.length) return;
+    const form = new FormData();
+    files.forEach((file) => form.append("files", file));
+
+    try {
+      await axios.post(`${API}/rooms/${roomId}/images`, form, { headers: getAuthHeaders() });
+      toast.success(files.length === 1 ? "Image uploaded" : `${files.length} images uploaded`);
+      fetchData();
+    } catch (error) {
+      toast.error(error.response?.data?.detail || "Failed to upload images");
+    }
+  };
+
   const deleteRoom = async (roomId) => {
     if (!window.confirm("Are you sure you want to delete this room?")) return;
     
@@ -378,7 +475,27 @@ const AdminDashboard = () => {
                             </SelectContent>
                           </Select>
                         </TableCell>
-                        <TableCell>
+                        <TableCell className="flex items-center gap-1">
+                          <Button
+                            variant="ghost"
+                            size="sm"
+                            asChild
+                            className="text-slate-500 hover:text-[#0F172A] cursor-pointer"
+                          >
+                            <label data-testid={`upload-images-${room.id}`}>
+                              <ImagePlus className="w-4 h-4" />
+                              <input
+                                type="file"
+                                accept="image/*"
+                                multiple
+                                className="hidden"
+                                onChange={(e) => {
+                                  uploadRoomImages(room.id, Array.from(e.target.files));
+                                  e.target.value = "";
+                                }}
+                              />
+                            </label>
+                          </Button>
                           <Button 
                             variant="ghost" 
                             size="sm"
@@ -440,7 +557,14 @@ const AdminDashboard = () => {
                             <p className="text-xs text-slate-400">{booking.room_type}</p>
                           </div>
                         </TableCell>
-                        <TableCell>{booking.preferred_move_in_date}</TableCell>
+                        <TableCell>
+                          <div>
+                            <p>{booking.preferred_move_in_date}</p>
+                            {booking.move_out_date && (
+                              <p className="text-xs text-slate-400">until {booking.move_out_date}</p>
+                            )}
+                          </div>
+                        </TableCell>
                         <TableCell>
                           <div className="flex items-center gap-2">
                             {getStatusIcon(booking.status)}
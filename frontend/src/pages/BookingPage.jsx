@@ -1,5 +1,5 @@
 /* eslint-disable react-hooks/exhaustive-deps */
-import { useState, useEffect } from "react";
+import { useState, useEffect, useRef } from "react";
 import { useParams, Link, useNavigate } from "react-router-dom";
 import axios from "axios";
 import { Button } from "@/components/ui/button";
@@ -26,6 +26,7 @@ import {
   CheckCircle2,
   Loader2
 } from "lucide-react";
+import { roomImage } from "@/lib/utils";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -38,6 +39,8 @@ const BookingPage = () => {
   const [submitting, setSubmitting] = useState(false);
   const [submitted, setSubmitted] = useState(false);
   const [date, setDate] = useState(null);
+  // Retries of an unchanged submission reuse one key so the server replays it
+  const submissionRef = useRef(null);
   
   const [formData, setFormData] = useState({
     full_name: "",
@@ -110,7 +113,14 @@ const BookingPage = () => {
         preferred_move_in_date: format(date, "yyyy-MM-dd"),
       };
 
-      await axios.post(`${API}/bookings`, bookingData);
+      const body = JSON.stringify(bookingData);
+      if (submissionRef.current?.body !== body) {
+        submissionRef.current = { body, key: crypto.randomUUID() };
+      }
+
+      await axios.post(`${API}/bookings`, bookingData, {
+        headers: { "Idempotency-Key": submissionRef.current.key },
+      });
       setSubmitted(true);
       toast.success("Booking request submitted successfully!");
     } catch (error) {
@@ -333,7 +343,7 @@ const BookingPage = () => {
               <div className="bg-white rounded-xl border border-slate-100 overflow-hidden sticky top-24">
                 <div className="aspect-video">
                   <img 
-                    src={room.images[0]} 
+                    src={roomImage(room.images[0], "card")} 
                     alt={room.name}
                     className="w-full h-full object-cover"
                   />
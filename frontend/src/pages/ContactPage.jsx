@@ -1,4 +1,4 @@
-import { useState } from "react";
+import { useState, useRef } from "react";
 import axios from "axios";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
@@ -26,6 +26,8 @@ const ContactPage = () => {
   });
   const [submitting, setSubmitting] = useState(false);
   const [submitted, setSubmitted] = useState(false);
+  // Retries of an unchanged submission reuse one key so the server replays it
+  const submissionRef = useRef(null);
 
   const handleInputChange = (e) => {
     const { name, value } = e.target;
@@ -42,7 +44,13 @@ const ContactPage = () => {
 
     try {
       setSubmitting(true);
-      await axios.post(`${API}/contact`, formData);
+      const body = JSON.stringify(formData);
+      if (submissionRef.current?.body !== body) {
+        submissionRef.current = { body, key: crypto.randomUUID() };
+      }
+      await axios.post(`${API}/contact`, formData, {
+        headers: { "Idempotency-Key": submissionRef.current.key },
+      });
       setSubmitted(true);
       toast.success("Message sent successfully!");
     } catch (error) {
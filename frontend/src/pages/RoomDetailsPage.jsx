@@ -12,6 +12,7 @@ import {
   ChevronLeft,
   ChevronRight
 } from "lucide-react";
+import { roomImage } from "@/lib/utils";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
@@ -114,7 +115,7 @@ const RoomDetailsPage = () => {
             {/* Main Image */}
             <div className="relative gallery-main aspect-[4/3] bg-slate-100">
               <img 
-                src={room.images[activeImage]} 
+                src={roomImage(room.images[activeImage])} 
                 alt={`${room.name} - Image ${activeImage + 1}`}
                 className="w-full h-full object-cover"
                 data-testid="main-image"
@@ -159,8 +160,9 @@ const RoomDetailsPage = () => {
                     data-testid={`thumbnail-${index}`}
                   >
                     <img 
-                      src={image} 
+                      src={roomImage(image, "thumb")} 
                       alt={`Thumbnail ${index + 1}`}
+                      loading="lazy"
                       className="w-full h-full object-cover"
                     />
                   </button>
@@ -11,25 +11,30 @@ import {
   SelectValue,
 } from "@/components/ui/select";
 import { Users, Bed, ArrowRight } from "lucide-react";
+import { roomImage } from "@/lib/utils";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
 
+// Only what the room cards render
+const CARD_FIELDS = "name,room_type,price,security_deposit,amenities,images,availability_status";
+
 const RoomsPage = () => {
   const [rooms, setRooms] = useState([]);
   const [loading, setLoading] = useState(true);
   const [filterType, setFilterType] = useState("all");
   const [filterAvailability, setFilterAvailability] = useState("all");
+  const [sortBy, setSortBy] = useState("default");
 
   useEffect(() => {
     fetchRooms();
-  }, [filterType, filterAvailability]);
+  }, [filterType, filterAvailability, sortBy]);
 
   const fetchRooms = async () => {
     try {
       setLoading(true);
       let url = `${API}/rooms`;
-      const params = new URLSearchParams();
+      const params = new URLSearchParams({ fields: CARD_FIELDS });
       
       if (filterType !== "all") {
         params.append("room_type", filterType);
@@ -37,11 +42,12 @@ const RoomsPage = () => {
       if (filterAvailability !== "all") {
         params.append("availability", filterAvailability);
       }
-      
-      if (params.toString()) {
-        url += `?${params.toString()}`;
+      if (sortBy !== "default") {
+        params.append("sort", sortBy);
       }
       
+      url += `?${params.toString()}`;
+      
       const response = await axios.get(url);
       setRooms(response.data);
     } catch (error) {
@@ -116,6 +122,17 @@ const RoomsPage = () => {
               </SelectContent>
             </Select>
 
+            <Select value={sortBy} onValueChange={setSortBy}>
+              <SelectTrigger className="w-[180px]" data-testid="sort-rooms">
+                <SelectValue placeholder="Sort" />
+              </SelectTrigger>
+              <SelectContent>
+                <SelectItem value="default">Recommended</SelectItem>
+                <SelectItem value="price">Price: Low to High</SelectItem>
+                <SelectItem value="-price">Price: High to Low</SelectItem>
+              </SelectContent>
+            </Select>
+
             {(filterType !== "all" || filterAvailability !== "all") && (
               <Button 
                 variant="ghost" 
@@ -178,8 +195,9 @@ const RoomsPage = () => {
                   {/* Image */}
                   <div className="relative h-56 overflow-hidden">
                     <img 
-                      src={room.images[0]} 
+                      src={roomImage(room.images[0], "card")} 
                       alt={room.name}
+                      loading="lazy"
                       className="room-image w-full h-full object-cover"
                     />
                     <div className="absolute top-4 left-4">
@@ -0,0 +1,97 @@
+"""Booking admission through the API on in-memory storage.
+
+No database or network is needed. The app is driven in process over
+httpx's ASGI transport, so concurrent requests interleave on one event loop
+the way they do under uvicorn.
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import httpx
+import pytest
+
+os.environ.update(STORAGE_BACKEND="memory", RATE_LIMIT_BACKEND="off", EMAIL_SENDER="stub")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+import server  # noqa: E402
+
+@pytest.fixture(autouse=True)
+def write_gate(monkeypatch):
+    # The gate's condition binds to the first event loop that waits on it
+    monkeypatch.setattr(server, "booking_writes", server.BookingWriteGate())
+
+def run(test):
+    async def main():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test/api") as client:
+            await test(client)
+    asyncio.run(main())
+
+async def create_room(slots: int) -> dict:
+    room = server.Room(
+        name="Stress Test Room", room_type="4-in-1", price=4000, description="Temporary room for the booking rush.",
+        amenities=[], images=[], total_slots=slots, available_slots=slots,
+    ).model_dump()
+    await server.storage.rooms.insert(room)
+    server.room_cache.invalidate()
+    return room
+
+async def delete_room(room: dict):
+    """Remove the room and every booking made for it, uncounting their occupancy."""
+    for booking in await server.storage.bookings.find({"room_id": room["id"]}):
+        await server.occupy(booking, -1)
+        await server.storage.bookings.delete(booking["id"])
+    await server.storage.rooms.delete(room["id"])
+    server.room_cache.invalidate()
+
+def booking_for(room: dict, n: int) -> dict:
+    return {
+        "room_id": room["id"],
+        "room_name": room["name"],
+        "room_type": room["room_type"],
+        "full_name": f"Rush Student {n}",
+        "phone_number": "0551234567",
+        "email": f"rush{n}@student.com",
+        "school": "University of Ghana",
+        "preferred_move_in_date": "2026-09-01",
+    }
+
+def test_booking_rush_never_overbooks():
+    slots, requests_count = 5, 200
+
+    async def test(client):
+        room = await create_room(slots)
+        try:
+            responses = await asyncio.gather(*(
+                client.post("/bookings", json=booking_for(room, n)) for n in range(requests_count)
+            ))
+            codes = [response.status_code for response in responses]
+            assert codes.count(200) == slots
+            assert codes.count(400) == requests_count - slots
+
+            stored = await server.storage.rooms.get(room["id"])
+            assert stored["available_slots"] == 0 and stored["availability_status"] == "fully_booked"
+            assert len(await server.storage.bookings.find({"room_id": room["id"]})) == slots
+
+            # The default nine-month stay ends in 2027, so the room is free again by 2028
+            busy = await client.get("/rooms/available", params={"from": "2026-09-01", "to": "2026-10-01"})
+            free = await client.get("/rooms/available", params={"from": "2028-09-01", "to": "2028-10-01"})
+            assert room["id"] not in [doc["id"] for doc in busy.json()]
+            assert [doc["free_beds"] for doc in free.json() if doc["id"] == room["id"]] == [slots]
+        finally:
+            await delete_room(room)
+        assert await server.storage.bookings.find({"room_id": room["id"]}) == []
+    run(test)
+
+def test_booking_unknown_or_full_room_is_rejected():
+    async def test(client):
+        room = await create_room(1)
+        try:
+            assert (await client.post("/bookings", json={**booking_for(room, 0), "room_id": "missing"})).status_code == 404
+            assert (await client.post("/bookings", json=booking_for(room, 1))).status_code == 200
+            assert (await client.post("/bookings", json=booking_for(room, 2))).status_code == 400
+        finally:
+            await delete_room(room)
+    run(test)
@@ -0,0 +1,394 @@
+"""Contract tests shared by the in-memory and MongoDB storage backends.
+
+The memory backend always runs. The Motor backend runs against a throwaway
+database when MONGO_URL points at a reachable server:
+
+    MONGO_URL=mongodb://localhost:27017 python -m pytest tests
+"""
+import asyncio
+import os
+import sys
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+from repositories import INDEXES, DuplicateRecordError, MemoryStorage, MotorStorage, stay_months  # noqa: E402
+
+T0 = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+@pytest.fixture(params=["memory", "motor"])
+def run(request):
+    """Call run(test) with an async test taking a fresh storage object."""
+    if request.param == "memory":
+        return lambda test: asyncio.run(test(MemoryStorage()))
+
+    mongo_url = os.environ.get('MONGO_URL')
+    if not mongo_url:
+        pytest.skip("MONGO_URL not set")
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    def run_motor(test):
+        async def main():
+            client = AsyncIOMotorClient(mongo_url, tz_aware=True, serverSelectionTimeoutMS=2000)
+            db_name = f"test_repositories_{uuid.uuid4().hex[:8]}"
+            try:
+                await client.admin.command("ping")
+            except Exception as e:
+                pytest.skip(f"MongoDB not reachable: {e}")
+            try:
+                for collection, indexes in INDEXES.items():
+                    await client[db_name][collection].create_indexes(indexes)
+                await test(MotorStorage(client[db_name]))
+            finally:
+                await client.drop_database(db_name)
+                client.close()
+        asyncio.run(main())
+    return run_motor
+
+def booking(n, **fields):
+    return {
+        "id": f"b{n:03d}",
+        "room_id": "r1",
+        "full_name": f"Student {n}",
+        "email": f"student{n}@example.com",
+        "phone_number": f"0551{n:06d}",
+        "school": "University of Ghana",
+        "status": "pending",
+        "created_at": T0 + timedelta(minutes=n),
+        "updated_at": T0 + timedelta(minutes=n),
+        **fields,
+    }
+
+def room(n, **fields):
+    return {
+        "id": f"r{n}",
+        "name": f"Room {n}",
+        "room_type": "2-in-1",
+        "total_slots": 4,
+        "available_slots": 4,
+        "availability_status": "available",
+        "amenities": ["Wi-Fi"],
+        **fields,
+    }
+
+def ids(docs):
+    return [doc["id"] for doc in docs]
+
+def test_insert_get_returns_copies(run):
+    async def test(storage):
+        doc = room(1)
+        await storage.rooms.insert(doc)
+        doc["amenities"].append("changed")
+
+        stored = await storage.rooms.get("r1")
+        assert stored["amenities"] == ["Wi-Fi"]
+        assert "_id" not in stored
+        stored["amenities"].append("changed")
+        assert (await storage.rooms.get("r1"))["amenities"] == ["Wi-Fi"]
+
+        assert await storage.rooms.exists("r1")
+        assert not await storage.rooms.exists("r2")
+        assert await storage.rooms.get("r2") is None
+        assert ids(await storage.rooms.get_many(["r1", "r2"])) == ["r1"]
+    run(test)
+
+def test_duplicates_are_rejected(run):
+    async def test(storage):
+        await storage.rooms.insert(room(1))
+        with pytest.raises(DuplicateRecordError):
+            await storage.rooms.insert(room(1))
+
+        await storage.admins.insert({"id": "a1", "email": "admin@example.com"})
+        with pytest.raises(DuplicateRecordError):
+            await storage.admins.insert({"id": "a2", "email": "admin@example.com"})
+        assert (await storage.admins.get_by("email", "admin@example.com"))["id"] == "a1"
+        assert await storage.admins.get_by("email", "other@example.com") is None
+        assert await storage.admins.count() == 1
+    run(test)
+
+def test_update_and_delete(run):
+    async def test(storage):
+        await storage.rooms.insert_many([room(1), room(2)])
+        updated = await storage.rooms.update("r1", {"price": 3000})
+        assert updated["price"] == 3000 and updated["name"] == "Room 1"
+        assert await storage.rooms.update("missing", {"price": 1}) is None
+
+        deleted = await storage.rooms.delete("r1")
+        assert deleted["price"] == 3000
+        assert await storage.rooms.delete("r1") is None
+        assert ids(await storage.rooms.find(newest_first=False)) == ["r2"]
+    run(test)
+
+def test_upsert_replaces_by_id(run):
+    async def test(storage):
+        await storage.rooms.insert_many([room(1, price=1000), room(2)])
+        assert await storage.rooms.upsert_many([room(1, name="Renamed"), room(3)]) == (1, 1)
+        renamed = await storage.rooms.get("r1")
+        assert renamed["name"] == "Renamed" and "price" not in renamed
+        assert ids(await storage.rooms.find(newest_first=False)) == ["r1", "r2", "r3"]
+        assert await storage.rooms.upsert_many([]) == (0, 0)
+    run(test)
+
+def test_rooms_keep_insertion_order(run):
+    async def test(storage):
+        await storage.rooms.insert_many([room(1), room(2, room_type="4-in-1"), room(3)])
+        await storage.rooms.update("r1", {"availability_status": "almost_full"})
+
+        assert ids(await storage.rooms.find(newest_first=False)) == ["r1", "r2", "r3"]
+        assert ids(await storage.rooms.find({"room_type": "2-in-1"}, newest_first=False)) == ["r1", "r3"]
+        assert ids(await storage.rooms.find(
+            {"room_type": "2-in-1", "availability_status": "available"}, newest_first=False
+        )) == ["r3"]
+        assert ids(await storage.rooms.find(newest_first=False, limit=2)) == ["r1", "r2"]
+    run(test)
+
+def test_room_catalog_filters_sorts_and_projects(run):
+    async def test(storage):
+        await storage.rooms.insert_many([
+            room(1, price=4500), room(2, price=3000), room(3, price=4500, room_type="4-in-1"), room(4, price=6000),
+        ])
+        by_price = [("price", 1), ("id", 1)]
+
+        assert ids(await storage.rooms.catalog()) == ["r1", "r2", "r3", "r4"]
+        assert ids(await storage.rooms.catalog(sort=by_price)) == ["r2", "r1", "r3", "r4"]
+        assert ids(await storage.rooms.catalog(sort=[("price", -1), ("id", -1)])) == ["r4", "r3", "r1", "r2"]
+        assert ids(await storage.rooms.catalog(min_price=3500, max_price=5000)) == ["r1", "r3"]
+        assert ids(await storage.rooms.catalog({"room_type": "2-in-1"}, min_price=4000)) == ["r1", "r4"]
+        assert ids(await storage.rooms.catalog(ids=["r4", "r2", "missing"])) == ["r2", "r4"]
+        assert await storage.rooms.catalog(ids=[]) == []
+
+        cards = await storage.rooms.catalog(sort=by_price, fields=["id", "price"], max_price=4500)
+        assert cards == [{"id": "r2", "price": 3000}, {"id": "r1", "price": 4500}, {"id": "r3", "price": 4500}]
+    run(test)
+
+def test_newest_first_keyset_pages(run):
+    async def test(storage):
+        # b005 and b006 share a timestamp so id breaks the tie
+        await storage.bookings.insert_many([booking(n) for n in range(5)])
+        await storage.bookings.insert_many([
+            booking(5, created_at=T0 + timedelta(hours=1)),
+            booking(6, created_at=T0 + timedelta(hours=1), status="confirmed"),
+        ])
+
+        first = await storage.bookings.find(limit=3)
+        assert ids(first) == ["b006", "b005", "b004"]
+        cursor = (first[-1]["created_at"], first[-1]["id"])
+        assert ids(await storage.bookings.find(after=cursor, limit=3)) == ["b003", "b002", "b001"]
+        assert ids(await storage.bookings.find(after=(first[0]["created_at"], first[0]["id"]), limit=1)) == ["b005"]
+
+        assert ids(await storage.bookings.find({"status": "pending"}, limit=2)) == ["b005", "b004"]
+        assert ids([doc async for doc in storage.bookings.iterate({"status": "confirmed"})]) == ["b006"]
+        assert len([doc async for doc in storage.bookings.iterate()]) == 7
+    run(test)
+
+def test_since_uses_each_collections_timestamp(run):
+    async def test(storage):
+        await storage.bookings.insert_many([booking(n) for n in range(3)])
+        await storage.bookings.set_status("b000", "confirmed", T0 + timedelta(hours=2))
+        assert ids(await storage.bookings.find(since=T0 + timedelta(hours=1))) == ["b000"]
+
+        await storage.contact_messages.insert_many([
+            {"id": "m1", "name": "Ama", "email": "ama@example.com", "message": "Hello", "created_at": T0},
+            {"id": "m2", "name": "Kojo", "email": "kojo@example.com", "message": "Hi", "created_at": T0 + timedelta(hours=2)},
+        ])
+        assert ids(await storage.contact_messages.find(since=T0 + timedelta(hours=1))) == ["m2"]
+    run(test)
+
+def test_counts(run):
+    async def test(storage):
+        await storage.bookings.insert_many([
+            booking(0), booking(1), booking(2, status="confirmed"), booking(3, status="cancelled"),
+        ])
+        assert await storage.bookings.count() == 4
+        assert await storage.bookings.count(status="pending") == 2
+        assert await storage.bookings.counts("status", ["pending", "confirmed"]) == {
+            "total": 4, "pending": 2, "confirmed": 1,
+        }
+        assert await storage.contact_messages.counts() == {"total": 0}
+    run(test)
+
+def test_slot_reservation(run):
+    async def test(storage):
+        await storage.rooms.insert(room(1, total_slots=4, available_slots=2))
+
+        before = await storage.rooms.reserve_slot("r1")
+        assert before["available_slots"] == 2
+        after = await storage.rooms.get("r1")
+        assert (after["available_slots"], after["availability_status"]) == (1, "almost_full")
+
+        assert await storage.rooms.reserve_slot("r1") is not None
+        assert (await storage.rooms.get("r1"))["availability_status"] == "fully_booked"
+        assert await storage.rooms.reserve_slot("r1") is None
+        assert await storage.rooms.reserve_slot("missing") is None
+
+        assert await storage.rooms.release_slots("r1", 10) is not None
+        after = await storage.rooms.get("r1")
+        assert (after["available_slots"], after["availability_status"]) == (4, "available")
+        assert await storage.rooms.release_slots("r1") is None
+    run(test)
+
+def test_booking_status_changes(run):
+    async def test(storage):
+        await storage.bookings.insert_many([booking(n) for n in range(3)])
+        stamp = T0 + timedelta(days=1)
+
+        previous = await storage.bookings.set_status("b000", "confirmed", stamp)
+        assert previous["status"] == "pending"
+        assert await storage.bookings.set_status("b000", "confirmed", stamp) is None
+        assert await storage.bookings.set_status("b000", "cancelled", stamp, expected="pending") is None
+        assert await storage.bookings.set_status("missing", "confirmed", stamp) is None
+        current = await storage.bookings.get("b000")
+        assert (current["status"], current["updated_at"]) == ("confirmed", stamp)
+
+        changed = await storage.bookings.set_statuses(
+            [("b000", "pending"), ("b001", "pending"), ("b002", "pending")], "cancelled", stamp
+        )
+        assert changed == {"b001", "b002"}
+        assert await storage.bookings.set_statuses([], "cancelled", stamp) == set()
+        assert await storage.bookings.count(status="cancelled") == 2
+    run(test)
+
+def test_prefix_search(run):
+    async def test(storage):
+        await storage.bookings.insert_many([booking(n) for n in range(12)])
+        assert not storage.bookings.ranks("student1@")
+        assert ids(await storage.bookings.find(search="student1@")) == ["b001"]
+        # Without an @ the term is a text search, so only the whole word matches
+        assert ids(await storage.bookings.find(search="student1")) == ["b001"]
+        assert ids(await storage.bookings.find(search="055100001")) == ["b011", "b010"]
+
+        first = await storage.bookings.find(search="0551", limit=5)
+        assert ids(first) == ["b011", "b010", "b009", "b008", "b007"]
+        cursor = (first[-1]["created_at"], first[-1]["id"])
+        assert ids(await storage.bookings.find(search="0551", after=cursor, limit=2)) == ["b006", "b005"]
+        assert await storage.bookings.find(search="0552") == []
+        assert ids(await storage.bookings.find({"status": "confirmed"}, search="0551")) == []
+    run(test)
+
+def test_prefix_search_ignores_case_and_phone_formatting(run):
+    async def test(storage):
+        await storage.bookings.insert_many([
+            booking(0, email="Ama.Mensah@Example.com", phone_number="+233 55 123-4567"),
+            booking(1, email="kofi@example.com", phone_number="0551234567"),
+        ])
+        assert ids(await storage.bookings.find(search="ama.mensah@")) == ["b000"]
+        assert ids(await storage.bookings.find(search="KOFI@EXAMPLE")) == ["b001"]
+        assert ids(await storage.bookings.find(search="233-55-123")) == ["b000"]
+        assert ids(await storage.bookings.find(search="055 123 4567")) == ["b001"]
+
+        stored = await storage.bookings.get("b000")
+        assert stored["email"] == "Ama.Mensah@Example.com" and stored["phone_number"] == "+233 55 123-4567"
+        assert set(stored) == set(booking(0))
+
+        await storage.bookings.update("b001", {"email": "Yaw@Example.com"})
+        assert ids(await storage.bookings.find(search="yaw@")) == ["b001"]
+        assert await storage.bookings.find(search="kofi@") == []
+
+        await storage.contact_messages.insert({"id": "m1", "name": "Esi", "email": "Esi@Example.com", "message": "Hi",
+                                               "created_at": T0})
+        assert ids(await storage.contact_messages.find(search="esi@example")) == ["m1"]
+    run(test)
+
+def test_text_search_ranks_by_weight(run):
+    async def test(storage):
+        await storage.bookings.insert_many([
+            booking(0, full_name="Ama Mensah", school="Legon"),
+            booking(1, full_name="Kofi Boateng", school="Legon"),
+            booking(2, full_name="Kofi Legon", school="KNUST"),
+            booking(3, full_name="Yaw Owusu", school="KNUST"),
+        ])
+        assert storage.bookings.ranks("Legon")
+        # A name match outweighs a school match; equal scores fall back to newest first
+        assert ids(await storage.bookings.find(search="Legon")) == ["b002", "b001", "b000"]
+        assert ids(await storage.bookings.find(search="Legon", offset=1, limit=1)) == ["b001"]
+        assert ids(await storage.bookings.find({"status": "pending"}, search="Owusu")) == ["b003"]
+        assert await storage.bookings.find(search="Accra") == []
+    run(test)
+
+def test_text_search_does_not_stem(run):
+    async def test(storage):
+        await storage.bookings.insert(booking(0, school="Nursing Training College"))
+        await storage.contact_messages.insert({"id": "m1", "name": "Esi", "email": "esi@example.com",
+                                               "message": "Asking about rooms", "created_at": T0})
+        assert ids(await storage.bookings.find(search="Nursing")) == ["b000"]
+        assert await storage.bookings.find(search="nurse") == []
+        assert ids(await storage.contact_messages.find(search="rooms")) == ["m1"]
+        assert await storage.contact_messages.find(search="room") == []
+    run(test)
+
+def month(year, number):
+    return datetime(year, number, 1, tzinfo=timezone.utc)
+
+def test_stay_months():
+    assert stay_months(date(2026, 9, 15), date(2026, 12, 1)) == [month(2026, 9), month(2026, 10), month(2026, 11)]
+    assert stay_months(date(2026, 12, 31), date(2027, 1, 2)) == [month(2026, 12), month(2027, 1)]
+    assert stay_months(date(2026, 9, 1), date(2026, 9, 2)) == [month(2026, 9)]
+
+def test_booking_dates_come_back_as_dates(run):
+    async def test(storage):
+        await storage.bookings.insert(booking(0, preferred_move_in_date=date(2026, 9, 1)))
+        stored = await storage.bookings.get("b000")
+        assert type(stored["preferred_move_in_date"]) is date
+        assert stored["preferred_move_in_date"] == date(2026, 9, 1)
+        updated = await storage.bookings.update("b000", {"move_out_date": date(2027, 6, 1)})
+        assert type(updated["move_out_date"]) is date
+        assert updated["move_out_date"] == date(2027, 6, 1)
+        assert (await storage.bookings.find())[0]["preferred_move_in_date"] == date(2026, 9, 1)
+        assert [doc["move_out_date"] async for doc in storage.bookings.iterate()] == [date(2027, 6, 1)]
+        assert type((await storage.bookings.get("b000"))["created_at"]) is datetime
+    run(test)
+
+def test_available_rooms_use_busiest_month(run):
+    async def test(storage):
+        await storage.rooms.insert_many([
+            room(1, total_slots=2, available_slots=0), room(2, total_slots=1, available_slots=0, room_type="1-in-1"),
+            room(3, total_slots=4),
+        ])
+        await storage.occupancy.add("r1", [month(2026, 9), month(2026, 10)], 1)
+        await storage.occupancy.add("r1", [month(2026, 10), month(2026, 11)], 1)
+        await storage.occupancy.add("r2", [month(2026, 9)], 1)
+        await storage.occupancy.add("r3", [month(2026, 9)], 1)
+        await storage.occupancy.add("r3", [month(2026, 9)], -1)
+
+        def free(rooms):
+            return {doc["id"]: doc["free_beds"] for doc in rooms}
+
+        assert free(await storage.rooms.available(month(2026, 9), month(2026, 9))) == {"r1": 1, "r3": 4}
+        assert free(await storage.rooms.available(month(2026, 9), month(2026, 11))) == {"r3": 4}
+        assert free(await storage.rooms.available(month(2026, 11), month(2026, 12))) == {"r1": 1, "r2": 1, "r3": 4}
+        assert free(await storage.rooms.available(month(2026, 11), month(2026, 12), min_free=2)) == {"r3": 4}
+        assert free(await storage.rooms.available(month(2026, 9), month(2026, 9), {"room_type": "1-in-1"})) == {}
+        rooms = await storage.rooms.available(month(2027, 1), month(2027, 1))
+        assert ids(rooms) == ["r1", "r2", "r3"] and "occupancy" not in rooms[0]
+
+        await storage.occupancy.replace({("r2", month(2026, 9)): 0, ("r3", month(2026, 9)): 4})
+        assert free(await storage.rooms.available(month(2026, 9), month(2026, 10))) == {"r1": 2, "r2": 1}
+    run(test)
+
+def test_room_full_for_a_year_is_available_after_it(run):
+    async def test(storage):
+        # Two beds, both taken by stays covering Sep 2026 to Aug 2027
+        await storage.rooms.insert(room(1, total_slots=2, available_slots=0, availability_status="fully_booked"))
+        year = [month(2026 + (m > 12), (m - 1) % 12 + 1) for m in range(9, 21)]
+        await storage.occupancy.add("r1", year, 1)
+        await storage.occupancy.add("r1", year, 1)
+
+        assert await storage.rooms.available(month(2026, 9), month(2026, 9)) == []
+        assert await storage.rooms.available(month(2027, 6), month(2027, 9)) == []
+        rooms = await storage.rooms.available(month(2027, 9), month(2028, 6), min_free=2)
+        assert ids(rooms) == ["r1"] and rooms[0]["free_beds"] == 2
+    run(test)
+
+def test_add_images_appends_without_duplicates(run):
+    async def test(storage):
+        await storage.rooms.insert(room(1, images=["a"]))
+        updated = await storage.rooms.add_images("r1", ["b", "a", "c"])
+        assert updated["images"] == ["a", "b", "c"]
+        await asyncio.gather(storage.rooms.add_images("r1", ["d"]), storage.rooms.add_images("r1", ["e"]))
+        assert sorted((await storage.rooms.get("r1"))["images"]) == ["a", "b", "c", "d", "e"]
+        assert await storage.rooms.add_images("missing", ["a"]) is None
+    run(test)